@@ -0,0 +1,199 @@
+"""
+Frames per second of the game loop's hot paths, headless.
+
+Runs through SDL's dummy video and audio drivers, so it works on a server
+or in CI. Each scenario runs `--frames` frames `--repeat` times and the
+best run is reported:
+
+    simulation   Simulation.step() only
+    update       GameEngine.update() (simulation, sounds, interpolation state)
+    render       GameEngine.render() into the display surface
+    dirty        GameEngine.render_dirty()
+    full_loop    handle_input() + update() + render() + display.flip()
+    ball_rect    Ball.rect()
+    auto_track   Paddle.auto_track()
+
+Frame scenarios run at every `--resolutions` size. Results can be written
+as JSON, saved as a baseline, and compared against one; the exit status is
+1 if any scenario is more than `--tolerance` slower than its baseline.
+
+    python benchmarks/engine_loop.py --save-baseline benchmarks/baseline.json
+    python benchmarks/engine_loop.py --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+
+pygame.init()
+
+from game.game_engine import GameEngine  # noqa: E402
+from game.simulation import Simulation  # noqa: E402
+from game.ai import track  # noqa: E402
+
+RESOLUTIONS = ["800x600", "1280x720", "1920x1080"]
+TARGET_SCORE = 60000  # keep the match going for the whole run
+
+
+def new_engine(width, height):
+    engine = GameEngine(width, height, seed=1)
+    engine.target_score = TARGET_SCORE
+    engine.player_controller = track  # rallies instead of a point every few seconds
+    return engine
+
+
+def bench_simulation(width, height, frames):
+    sim = Simulation(width, height, seed=1)
+    sim.target_score = TARGET_SCORE
+    sim.player_controller = track
+    step = sim.step
+    started = time.perf_counter()
+    for _ in range(frames):
+        step()
+    return time.perf_counter() - started
+
+
+def bench_update(width, height, frames):
+    engine = new_engine(width, height)
+    update = engine.update
+    started = time.perf_counter()
+    for _ in range(frames):
+        update()
+    return time.perf_counter() - started
+
+
+def bench_render(width, height, frames, dirty=False):
+    screen = pygame.display.set_mode((width, height))
+    engine = new_engine(width, height)
+    render = engine.render_dirty if dirty else engine.render
+    elapsed = 0.0
+    for _ in range(frames):
+        engine.update()  # not timed; gives every frame something new to draw
+        started = time.perf_counter()
+        render(screen, 0.5)
+        elapsed += time.perf_counter() - started
+    return elapsed
+
+
+def bench_dirty(width, height, frames):
+    return bench_render(width, height, frames, dirty=True)
+
+
+def bench_full_loop(width, height, frames):
+    screen = pygame.display.set_mode((width, height))
+    engine = new_engine(width, height)
+    started = time.perf_counter()
+    for _ in range(frames):
+        pygame.event.pump()
+        engine.handle_input()
+        engine.update()
+        engine.render(screen, 1.0)
+        pygame.display.flip()
+    return time.perf_counter() - started
+
+
+def bench_ball_rect(width, height, frames):
+    ball = Simulation(width, height, seed=1).ball
+    rect = ball.rect
+    started = time.perf_counter()
+    for _ in range(frames):
+        rect()
+    return time.perf_counter() - started
+
+
+def bench_auto_track(width, height, frames):
+    sim = Simulation(width, height, seed=1)
+    ball, paddle, auto_track = sim.ball, sim.ai, sim.ai.auto_track
+    started = time.perf_counter()
+    for i in range(frames):
+        ball.y = i % height  # keep the paddle moving both ways
+        auto_track(ball, height)
+    return time.perf_counter() - started
+
+
+# name -> (function, runs at every resolution)
+SCENARIOS = {
+    "simulation": (bench_simulation, True),
+    "update": (bench_update, True),
+    "render": (bench_render, True),
+    "dirty": (bench_dirty, True),
+    "full_loop": (bench_full_loop, True),
+    "ball_rect": (bench_ball_rect, False),
+    "auto_track": (bench_auto_track, False),
+}
+
+
+def run(scenarios, resolutions, frames, repeat):
+    """Returns {"scenario@WxH": frames per second} (micro benchmarks: calls per second)."""
+    results = {}
+    for name in scenarios:
+        function, per_resolution = SCENARIOS[name]
+        for resolution in resolutions if per_resolution else resolutions[:1]:
+            width, height = map(int, resolution.split("x"))
+            best = min(function(width, height, frames) for _ in range(repeat))
+            key = f"{name}@{resolution}" if per_resolution else name
+            results[key] = frames / best
+            print(f"{key:<24}{results[key]:>14,.0f}/s")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Prints the change against `baseline`; returns the scenarios slower than `tolerance`."""
+    regressions = []
+    for key, value in results.items():
+        if key not in baseline:
+            continue
+        change = value / baseline[key] - 1
+        flag = ""
+        if change < -tolerance:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:<24}{baseline[key]:>14,.0f} -> {value:>14,.0f}/s {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--resolutions", nargs="+", default=RESOLUTIONS, metavar="WxH")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--save-baseline", metavar="FILE", help="store the results as a baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed slowdown before failing, 0..1 (default: %(default)s)")
+    args = parser.parse_args()
+
+    results = run(args.scenarios, args.resolutions, args.frames, args.repeat)
+    report = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "frames": args.frames,
+        "results": results,
+    }
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Memory per headless match, as a server hosting many matches pays it.
+
+Creates `--matches` Simulation instances (and, separately, their Ball and
+Paddle objects) under tracemalloc and reports the bytes allocated per
+instance, plus how long a tight loop over the hot attributes takes.
+
+    python benchmarks/match_memory.py --matches 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.simulation import Simulation  # noqa: E402
+from game.ball import Ball  # noqa: E402
+from game.paddle import Paddle  # noqa: E402
+
+
+def bytes_per(factory, count):
+    """Average bytes still allocated per object after creating `count` of them."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def attribute_loop(frames):
+    """Seconds for `frames` Simulation.step() calls of one match."""
+    sim = Simulation(800, 600, seed=1)
+    sim.target_score = 60000
+    step = sim.step
+    started = time.perf_counter()
+    for _ in range(frames):
+        step()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--matches", type=int, default=10000)
+    parser.add_argument("--frames", type=int, default=100000)
+    args = parser.parse_args()
+
+    n = args.matches
+    rng = random.Random(1)  # shared, so Ball is measured without its own generator
+    results = {
+        "Simulation (whole match)": bytes_per(lambda i: Simulation(800, 600, seed=i), n),
+        "Ball": bytes_per(lambda i: Ball(400, 300, 7, 7, 800, 600, rng), n),
+        "Paddle": bytes_per(lambda i: Paddle(10, 250, 10, 100), n),
+    }
+    for name, size in results.items():
+        print(f"{name:<26}{size:>10,.0f} bytes")
+    print(f"{'steps per second':<26}{args.frames / attribute_loop(args.frames):>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Bytes per second per match of the spectator delta protocol, over UDP loopback.
+
+Each match is simulated at 60 Hz (as fast as possible, not real time), its
+state is encoded against the last acknowledged baseline and sent through a
+loopback socket; the receiver decodes it, checks it against the source and
+acknowledges it. Full-state messages are counted alongside for comparison.
+
+    python benchmarks/protocol_bandwidth.py --matches 20 --seconds 60 --loss 0.05
+"""
+import argparse
+import os
+import random
+import socket
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.protocol import DeltaEncoder, DeltaDecoder, MAX_MESSAGE_SIZE, quantize  # noqa: E402
+from game.simulation import Simulation, BASE_TICK_RATE  # noqa: E402
+
+ACK = struct.Struct("<HI")  # match index, acknowledged tick (RESYNC = baseline lost)
+RESYNC = 0xFFFFFFFF
+UDP_IP_OVERHEAD = 28
+
+
+def run(matches, seconds, loss, seed):
+    rng = random.Random(seed)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.bind(("127.0.0.1", 0))
+    receiver.bind(("127.0.0.1", 0))
+    sender.settimeout(1.0)
+    receiver.settimeout(1.0)
+
+    sims = [Simulation(800, 600, seed=rng.getrandbits(64)) for _ in range(matches)]
+    encoders = [DeltaEncoder() for _ in range(matches)]
+    decoders = [DeltaDecoder() for _ in range(matches)]
+    buffer = bytearray(2 + MAX_MESSAGE_SIZE)
+    delta_bytes = full_bytes = sent = lost = resyncs = 0
+    inputs = [0] * matches
+
+    for tick in range(seconds * BASE_TICK_RATE):
+        for i, sim in enumerate(sims):
+            # A human-like player: holds a direction for a while, often idle
+            if rng.random() < 0.03:
+                inputs[i] = rng.choice((0, 0, 1, 2))
+            sim.step(inputs[i])
+            if sim.winner():
+                sim.reset_match()
+            values = quantize(sim)
+
+            struct.pack_into("<H", buffer, 0, i)
+            end = encoders[i].encode_into(buffer, 2, tick, values)
+            delta_bytes += end - 2
+            full_bytes += MAX_MESSAGE_SIZE
+            sent += 1
+            if rng.random() < loss:
+                lost += 1
+                continue
+            sender.sendto(buffer[:end], receiver.getsockname())
+
+            data = receiver.recv(2048)
+            match = struct.unpack_from("<H", data)[0]
+            decoded = decoders[match].decode(data, 2)
+            if decoded is None:
+                resyncs += 1
+                ack = RESYNC
+            else:
+                assert decoded[1] == values, "decoded state differs from the source"
+                ack = decoded[0]
+            if rng.random() >= loss:
+                receiver.sendto(ACK.pack(match, ack), sender.getsockname())
+                match, ack = ACK.unpack(sender.recv(64))
+                if ack == RESYNC:
+                    encoders[match].resync()
+                else:
+                    encoders[match].ack(ack)
+
+    sender.close()
+    receiver.close()
+    per_match = matches * seconds
+    return {
+        "delta_bytes_per_sec": delta_bytes / per_match,
+        "full_bytes_per_sec": full_bytes / per_match,
+        "udp_overhead_per_sec": sent * UDP_IP_OVERHEAD / per_match,
+        "messages": sent,
+        "lost": lost,
+        "resyncs": resyncs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--matches", type=int, default=10)
+    parser.add_argument("--seconds", type=int, default=60, help="simulated seconds per match")
+    parser.add_argument("--loss", type=float, default=0.0, help="simulated packet loss (0..1)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    result = run(args.matches, args.seconds, args.loss, args.seed)
+    saving = 1 - result["delta_bytes_per_sec"] / result["full_bytes_per_sec"]
+    print(f"payload: {result['delta_bytes_per_sec']:.0f} B/s per match with deltas, "
+          f"{result['full_bytes_per_sec']:.0f} B/s with full states ({saving:.0%} saved)")
+    print(f"plus {result['udp_overhead_per_sec']:.0f} B/s of UDP/IP headers per match")
+    print(f"{result['messages']} messages, {result['lost']} lost, {result['resyncs']} resyncs")
+
+
+if __name__ == "__main__":
+    main()
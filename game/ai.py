@@ -0,0 +1,193 @@
+"""
+AI paddle controllers.
+
+A controller is a callable `controller(sim, paddle, scale)` that moves
+`paddle` for one simulation tick; assign it to `Simulation.ai_controller`
+to replace the default `Paddle.auto_track()` chasing, or to
+`Simulation.player_controller` to let it play the left paddle.
+"""
+import random
+import time
+
+from .simulation import Simulation, STATE, BASE_TICK_RATE, INPUT_UP, INPUT_DOWN
+
+
+def track(sim, paddle, scale=1.0):
+    """The built-in AI as a controller: chases the ball (Paddle.auto_track)."""
+    paddle.auto_track(sim.ball, sim.height, scale)
+
+
+class PredictiveAI:
+    """
+    Moves to where the ball will cross the paddle's face.
+
+    The intercept is solved in closed form: the ball's straight-line path is
+    extended to the paddle and the wall reflections are folded back into the
+    court with modular arithmetic. It is recomputed only when the ball's
+    velocity changes, so the per-frame cost is O(1).
+
+    Difficulty knobs: `reaction_delay` is how many ticks the paddle waits
+    after each paddle bounce or serve before moving, and `error` is the
+    standard deviation (px) of the aiming error drawn once per bounce.
+    """
+    name = "predict"
+
+    def __init__(self, reaction_delay=0, error=0.0, seed=None):
+        self.reaction_delay = reaction_delay
+        self.error = error
+        self.rng = random.Random(seed)
+        self._velocity = None
+        self._vx = None
+        self._wait = 0
+        self._noise = 0.0
+        self._target = 0.0
+
+    def __call__(self, sim, paddle, scale=1.0):
+        ball = sim.ball
+        if ball.velocity_x != self._vx:
+            # New flight (paddle bounce or serve): react late and aim imperfectly
+            self._vx = ball.velocity_x
+            self._wait = self.reaction_delay
+            self._noise = self.rng.gauss(0.0, self.error) if self.error else 0.0
+        if (ball.velocity_x, ball.velocity_y) != self._velocity:
+            self._velocity = (ball.velocity_x, ball.velocity_y)
+            self._target = self.predict(sim, paddle)
+
+        if self._wait > 0:
+            self._wait -= 1
+            return
+        # Centre the paddle on the target, without overshooting it
+        dy = self._target + self._noise - paddle.height / 2 - paddle.y
+        step = paddle.speed * scale
+        paddle.move(max(-step, min(step, dy)), sim.height)
+
+    @staticmethod
+    def predict(sim, paddle):
+        """Centre y at which the ball reaches `paddle`, or the court centre if it moves away."""
+        ball = sim.ball
+        on_right = paddle.x > sim.width / 2
+        if (ball.velocity_x > 0) != on_right or ball.velocity_x == 0:
+            return sim.height / 2
+        face = paddle.x - ball.width if on_right else paddle.x + paddle.width
+        frames = (face - ball.x) / ball.velocity_x
+
+        # Unfold the wall bounces: the ball's top moves in [0, span]
+        span = sim.height - ball.height
+        y = (ball.y + ball.velocity_y * frames) % (2 * span)
+        if y > span:
+            y = 2 * span - y
+        return y + ball.height / 2
+
+
+# Paddle actions used by LookaheadAI
+STAY, UP, DOWN = 0, 1, 2
+
+
+class LookaheadAI:
+    """
+    Plans by simulating the future from a copy of the current state.
+
+    Every `decision_interval` ticks the state is packed with
+    Simulation.snapshot() and restored into a private scratch Simulation
+    for each rollout. A plan is two actions (stay/up/down), each held for
+    half of `horizon` ticks; every plan is played against the opponent
+    holding each possible input, and the plan with the best worst case is
+    kept (minimax over one ply). Rollouts stop when `budget_ms` is used up
+    or after `max_rollouts`, keeping the best plan found so far. The time
+    budget depends on machine load; for reproducible play (tournaments) set
+    `budget_ms=None` and limit the search by `max_rollouts` only.
+    """
+    name = "lookahead"
+
+    def __init__(self, horizon=60, decision_interval=6, budget_ms=4.0, max_rollouts=None):
+        self.horizon = horizon
+        self.decision_interval = decision_interval
+        self.budget_ms = budget_ms
+        self.max_rollouts = max_rollouts
+        self.plan = (STAY, STAY)
+        self.rollouts = 0  # total, for tuning the budget
+        self._ticks = 0    # since the last decision
+        self._action = STAY
+        self._scratch = None
+        self._buffer = bytearray(STATE.size)
+
+    def __call__(self, sim, paddle, scale=1.0):
+        if self._ticks % self.decision_interval == 0:
+            self._ticks = 0
+            self.plan = self.decide(sim, scale, paddle is sim.player)
+        action = self.plan[0] if self._ticks < self.horizon // 2 else self.plan[1]
+        self._ticks += 1
+        _apply(action, paddle, sim.height, scale)
+
+    def decide(self, sim, scale=1.0, left=False):
+        """
+        Returns the best (first, second) action plan from the current state,
+        for the right paddle or, with `left`, the left one.
+        """
+        if self._scratch is None or (self._scratch.width, self._scratch.height) != (sim.width, sim.height):
+            self._scratch = Simulation(sim.width, sim.height, sim.collision, seed=0)
+        scratch = self._scratch
+        scratch.collision = sim.collision
+        scratch.player_controller = self._play_action if left else None
+        scratch.ai_controller = None if left else self._play_action
+        sim.snapshot(self._buffer)
+
+        # Try the current plan first so running out of budget keeps us steady
+        plans = [self.plan] + [(a, b) for a in (STAY, UP, DOWN) for b in (STAY, UP, DOWN)
+                               if (a, b) != self.plan]
+        deadline = time.perf_counter() + self.budget_ms / 1000 if self.budget_ms is not None else None
+        rollouts_left = self.max_rollouts
+        best, best_value = self.plan, None
+        for plan in plans:
+            worst = None
+            for opponent_input in (0, INPUT_UP, INPUT_DOWN):
+                value = self._rollout(plan, opponent_input, scale, left)
+                self.rollouts += 1
+                if rollouts_left is not None:
+                    rollouts_left -= 1
+                if worst is None or value < worst:
+                    worst = value
+                if best_value is not None and worst <= best_value:
+                    break  # can't beat the best plan any more
+            if best_value is None or worst > best_value:
+                best, best_value = plan, worst
+            if rollouts_left is not None and rollouts_left <= 0:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        return best
+
+    def _rollout(self, plan, opponent_input, scale, left):
+        scratch = self._scratch
+        scratch.restore(self._buffer)
+        player_score, ai_score = scratch.player_score, scratch.ai_score
+        dt = scale / BASE_TICK_RATE
+        half = self.horizon // 2
+        paddle = scratch.player if left else scratch.ai
+
+        # The real paddle moves right after this call, then the game continues
+        _apply(plan[0], paddle, scratch.height, scale)
+        for tick in range(self.horizon):
+            self._action = plan[0] if tick < half - 1 else plan[1]
+            if left:
+                scratch.step(0, dt, opponent_input)
+            else:
+                scratch.step(opponent_input, dt)
+            if scratch.player_score != player_score:
+                return 1000 - tick if left else -1000 + tick  # conceding later is less bad
+            if scratch.ai_score != ai_score:
+                return -1000 + tick if left else 1000 - tick
+
+        # No point scored: prefer being lined up with the ball
+        ball = scratch.ball
+        return -abs(paddle.y + paddle.height / 2 - ball.y - ball.height / 2)
+
+    def _play_action(self, sim, paddle, scale):
+        _apply(self._action, paddle, sim.height, scale)
+
+
+def _apply(action, paddle, screen_height, scale):
+    if action == UP:
+        paddle.move(-paddle.speed * scale, screen_height)
+    elif action == DOWN:
+        paddle.move(paddle.speed * scale, screen_height)
@@ -0,0 +1,178 @@
+"""
+Many replays in one memory-mapped file, with random access.
+
+Layout:
+    file header    magic, keyframe interval, match count, index offset
+    match records  replay.HEADER, keyframe count, keyframes, packed inputs
+    index          one uint64 record offset per match
+
+Every `keyframe_interval` frames a record stores the full simulation state,
+so ArchiveReader.seek() restores the nearest keyframe and re-simulates at
+most `keyframe_interval - 1` frames instead of the whole match. New matches
+are appended at the end of the file, followed by a new index; the header
+is repointed only once that index is on disk, so an interrupted append
+leaves the archive as it was (the old index stays behind as dead bytes).
+"""
+import argparse
+import mmap
+import os
+import struct
+
+from .replay import HEADER, COLLISION_MODES, Replay, pack_inputs
+from .simulation import Simulation, STATE
+
+# Bumped whenever the keyframe layout (simulation.STATE) changes;
+# version 1 keyframes lack the seed and target score
+MAGIC = b"PONGARC2"
+
+# magic, keyframe_interval, match_count, index_offset
+FILE_HEADER = struct.Struct("<8sIIQ")
+KEYFRAME_COUNT = struct.Struct("<I")
+OFFSET = struct.Struct("<Q")
+
+DEFAULT_KEYFRAME_INTERVAL = 1800  # 30 s at 60 Hz
+
+
+def check_magic(magic):
+    if magic != MAGIC:
+        if magic[:7] == MAGIC[:7]:
+            raise ValueError(f"unsupported archive version {magic[7:].decode(errors='replace')!r}, "
+                             f"expected {MAGIC[7:].decode()!r}; rebuild it from the replays")
+        raise ValueError("not a ping pong archive")
+
+
+class ArchiveWriter:
+    """Creates an archive, or opens an existing one to append matches."""
+
+    def __init__(self, path, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, "r+b" if exists else "w+b")
+        self.offsets = []
+        if exists:
+            magic, self.keyframe_interval, count, index_offset = FILE_HEADER.unpack(
+                self.file.read(FILE_HEADER.size))
+            check_magic(magic)
+            self.file.seek(index_offset)
+            index = self.file.read(count * OFFSET.size)
+            self.offsets = [offset for (offset,) in OFFSET.iter_unpack(index)]
+            # The header keeps pointing at the old index until close()
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.keyframe_interval = keyframe_interval
+            self.file.write(FILE_HEADER.pack(MAGIC, keyframe_interval, 0, 0))
+
+    def add(self, replay):
+        """Appends a replay.Replay, computing its keyframes by re-simulating it."""
+        sim = replay.new_simulation()
+        keyframes = []
+        step, dt, interval = sim.step, replay.dt, self.keyframe_interval
+        for frame, inputs in enumerate(replay.inputs):
+            if frame % interval == 0:
+                keyframes.append(sim.snapshot())
+            step(inputs, dt)
+        if len(replay.inputs) % interval == 0:
+            keyframes.append(sim.snapshot())
+
+        self.offsets.append(self.file.tell())
+        self.file.write(replay.to_bytes()[:HEADER.size])
+        self.file.write(KEYFRAME_COUNT.pack(len(keyframes)))
+        self.file.write(b"".join(keyframes))
+        self.file.write(pack_inputs(replay.inputs))
+
+    def close(self):
+        index_offset = self.file.tell()
+        self.file.write(b"".join(OFFSET.pack(offset) for offset in self.offsets))
+        self.file.flush()
+        os.fsync(self.file.fileno())  # records and index first, then the header
+        self.file.seek(0)
+        self.file.write(FILE_HEADER.pack(MAGIC, self.keyframe_interval,
+                                         len(self.offsets), index_offset))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchiveReader:
+    """Read-only, memory-mapped view of an archive."""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.keyframe_interval, self.match_count, self.index_offset = \
+            FILE_HEADER.unpack_from(self.data)
+        check_magic(magic)
+
+    def __len__(self):
+        return self.match_count
+
+    def _record(self, match):
+        """Returns (offset, header fields, keyframe offset, inputs offset) of a match."""
+        if not 0 <= match < self.match_count:
+            raise IndexError(match)
+        (offset,) = OFFSET.unpack_from(self.data, self.index_offset + match * OFFSET.size)
+        header = HEADER.unpack_from(self.data, offset)
+        (keyframe_count,) = KEYFRAME_COUNT.unpack_from(self.data, offset + HEADER.size)
+        keyframes = offset + HEADER.size + KEYFRAME_COUNT.size
+        return offset, header, keyframes, keyframes + keyframe_count * STATE.size
+
+    def frame_count(self, match):
+        _, header, _, _ = self._record(match)
+        return header[-1]
+
+    def replay(self, match):
+        """Decodes a whole match as a replay.Replay."""
+        offset, header, _, inputs = self._record(match)
+        frame_count = header[-1]
+        return Replay.from_bytes(self.data[offset:offset + HEADER.size]
+                                 + self.data[inputs:inputs + (frame_count + 3) // 4])
+
+    def seek(self, match, frame, sim_class=Simulation, **kwargs):
+        """
+        Returns a `sim_class` instance in the state after `frame` ticks of
+        `match`, restored from the nearest keyframe at or before that frame.
+        """
+        _, header, keyframes, inputs = self._record(match)
+        (_, width, height, seed, collision, target_score, _, _, tick_rate, frame_count) = header
+        if not 0 <= frame <= frame_count:
+            raise IndexError(frame)
+
+        sim = sim_class(width, height, COLLISION_MODES[collision], seed=seed, **kwargs)
+        sim.target_score = target_score
+        keyframe = frame // self.keyframe_interval
+        sim.restore(self.data, keyframes + keyframe * STATE.size)
+
+        data, step, dt = self.data, sim.step, 1.0 / tick_rate
+        for i in range(keyframe * self.keyframe_interval, frame):
+            step((data[inputs + (i >> 2)] >> ((i & 3) * 2)) & 3, dt)
+        return sim
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append replay files to a match archive")
+    parser.add_argument("archive")
+    parser.add_argument("replays", nargs="+")
+    parser.add_argument("--keyframe-interval", type=int, default=DEFAULT_KEYFRAME_INTERVAL)
+    args = parser.parse_args()
+
+    with ArchiveWriter(args.archive, args.keyframe_interval) as writer:
+        for path in args.replays:
+            writer.add(Replay.load(path))
+    print(f"{args.archive}: {len(writer.offsets)} matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
-import pygame
 import random
 
 class Ball:
-    def __init__(self, x, y, width, height, screen_width, screen_height):
+    __slots__ = ("original_x", "original_y", "x", "y", "width", "height",
+                 "screen_width", "screen_height", "rng", "velocity_x", "velocity_y", "_rect")
+
+    def __init__(self, x, y, width, height, screen_width, screen_height, rng=None):
         self.original_x = x
         self.original_y = y
         self.x = x
@@ -11,26 +13,43 @@ class Ball:
         self.height = height
         self.screen_width = screen_width
         self.screen_height = screen_height
-        self.velocity_x = random.choice([-5, 5])
-        self.velocity_y = random.choice([-3, 3])
+        self.rng = rng if rng is not None else random.Random()
+        self._rect = None  # pygame.Rect reused by rect()
+        self.serve()
 
-    def move(self):
+    def move(self, scale=1.0):
         """
         Updates the ball's position based on its velocity.
+        `scale` is the fraction of a 60 Hz frame being simulated.
         Wall bounce logic has been removed from here to prevent double-reversal.
         """
-        self.x += self.velocity_x
-        self.y += self.velocity_y
+        self.x += self.velocity_x * scale
+        self.y += self.velocity_y * scale
 
     def check_collision(self, player, ai):
         if self.rect().colliderect(player.rect()) or self.rect().colliderect(ai.rect()):
             self.velocity_x *= -1
 
+    def serve(self):
+        """Centres the ball with a random direction, as at the start of a match."""
+        self.x = self.original_x
+        self.y = self.original_y
+        self.velocity_x = self.rng.choice([-5, 5])
+        self.velocity_y = self.rng.choice([-3, 3])
+
     def reset(self):
         self.x = self.original_x
         self.y = self.original_y
         self.velocity_x *= -1
-        self.velocity_y = random.choice([-3, 3])
+        self.velocity_y = self.rng.choice([-3, 3])
 
     def rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
\ No newline at end of file
+        """
+        The ball's bounds as a pygame.Rect. The same Rect is returned on
+        every call, updated in place, so copy it to keep an old position.
+        """
+        if self._rect is None:
+            import pygame  # only needed for rendering; the rules run without it
+            self._rect = pygame.Rect(0, 0, 0, 0)
+        self._rect.update(self.x, self.y, self.width, self.height)
+        return self._rect
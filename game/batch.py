@@ -0,0 +1,117 @@
+import numpy as np
+
+from .simulation import (INPUT_UP, INPUT_DOWN, PLAYER_SPEED,
+                         EVENT_PADDLE_HIT, EVENT_WALL_BOUNCE, EVENT_SCORE)
+
+
+class BatchSimulation:
+    """
+    Runs N independent matches at once.
+    State is kept as one NumPy array per field (structure of arrays) and
+    step() applies the same rules as Simulation.step() to every match.
+    """
+
+    def __init__(self, n, width, height, seed=None):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.paddle_width = 10
+        self.paddle_height = 100
+        self.ball_size = 7
+        self.ai_speed = 7
+        self.target_score = 5
+        self.rng = np.random.default_rng(seed)
+
+        self.player_x = 10
+        self.ai_x = width - 20
+        self.ball_start_x = width // 2
+        self.ball_start_y = height // 2
+        self.paddle_start_y = height // 2 - 50
+
+        self.ball_x = np.full(n, self.ball_start_x, dtype=np.float64)
+        self.ball_y = np.full(n, self.ball_start_y, dtype=np.float64)
+        self.ball_vx = self.rng.choice([-5.0, 5.0], size=n)
+        self.ball_vy = self.rng.choice([-3.0, 3.0], size=n)
+        self.player_y = np.full(n, self.paddle_start_y, dtype=np.float64)
+        self.ai_y = np.full(n, self.paddle_start_y, dtype=np.float64)
+        self.player_score = np.zeros(n, dtype=np.int32)
+        self.ai_score = np.zeros(n, dtype=np.int32)
+
+    def step(self, inputs=None):
+        """
+        Advances every match by one frame.
+        `inputs` is an optional array of INPUT_UP / INPUT_DOWN bitmasks, one per match.
+        Returns a uint8 array of EVENT_* flags per match.
+        """
+        w, h = self.width, self.height
+        ph, pw, size = self.paddle_height, self.paddle_width, self.ball_size
+        events = np.zeros(self.n, dtype=np.uint8)
+
+        if inputs is not None:
+            inputs = np.asarray(inputs)
+            self.player_y -= np.where(inputs & INPUT_UP, PLAYER_SPEED, 0)
+            np.clip(self.player_y, 0, h - ph, out=self.player_y)
+            self.player_y += np.where(inputs & INPUT_DOWN, PLAYER_SPEED, 0)
+            np.clip(self.player_y, 0, h - ph, out=self.player_y)
+
+        # Move the ball
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+        x, y = self.ball_x, self.ball_y
+
+        # Paddle collisions (player checked first, as in Simulation.step)
+        in_player_x = (x < self.player_x + pw) & (self.player_x < x + size)
+        in_ai_x = (x < self.ai_x + pw) & (self.ai_x < x + size)
+        hit_player = in_player_x & (y < self.player_y + ph) & (self.player_y < y + size)
+        hit_ai = ~hit_player & in_ai_x & (y < self.ai_y + ph) & (self.ai_y < y + size)
+        x[hit_player] = self.player_x + pw
+        x[hit_ai] = self.ai_x - size
+        hit = hit_player | hit_ai
+        self.ball_vx[hit] *= -1
+        events[hit] |= EVENT_PADDLE_HIT
+
+        # Wall bounce
+        wall = (y <= 0) | (y + size >= h)
+        self.ball_vy[wall] *= -1
+        events[wall] |= EVENT_WALL_BOUNCE
+
+        # Scoring
+        ai_scored = x <= 0
+        player_scored = ~ai_scored & (x >= w)
+        self.ai_score += ai_scored
+        self.player_score += player_scored
+        scored = ai_scored | player_scored
+        if scored.any():
+            self.reset_balls(scored)
+            events[scored] |= EVENT_SCORE
+
+        # Finally, move AI (Paddle.auto_track)
+        ai_y = self.ai_y
+        up = y < ai_y
+        down = ~up & (y > ai_y + ph)
+        ai_y -= np.where(up, self.ai_speed, 0)
+        ai_y += np.where(down, self.ai_speed, 0)
+        np.clip(ai_y, 0, h - ph, out=ai_y)
+        return events
+
+    def reset_balls(self, mask):
+        """Ball.reset() for the matches selected by the boolean `mask`."""
+        self.ball_x[mask] = self.ball_start_x
+        self.ball_y[mask] = self.ball_start_y
+        self.ball_vx[mask] *= -1
+        self.ball_vy[mask] = self.rng.choice([-3.0, 3.0], size=int(np.count_nonzero(mask)))
+
+    def winners(self):
+        """Returns an int8 array: 1 if the player won, -1 if the AI won, else 0."""
+        result = np.zeros(self.n, dtype=np.int8)
+        result[self.player_score >= self.target_score] = 1
+        result[self.ai_score >= self.target_score] = -1
+        return result
+
+    def reset_matches(self, mask):
+        """Starts a new match for the matches selected by the boolean `mask`."""
+        self.player_score[mask] = 0
+        self.ai_score[mask] = 0
+        self.reset_balls(mask)
+        self.player_y[mask] = self.paddle_start_y
+        self.ai_y[mask] = self.paddle_start_y
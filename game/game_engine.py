@@ -1,7 +1,9 @@
 import pygame
-from .paddle import Paddle
-from .ball import Ball
-import time
+from .simulation import (Simulation, INPUT_UP, INPUT_DOWN, COLLISION_DISCRETE,
+                         EVENT_PADDLE_HIT, EVENT_WALL_BOUNCE, EVENT_SCORE)
+from .text_cache import TextCache, DigitAtlas
+from .perf import PerfOverlay
+from .profiling import SPAN_STEP, SPAN_SOUND
 import os
 
 # Initialize pygame mixer
@@ -9,26 +11,60 @@ pygame.mixer.init()
 
 # Game Engine constants
 WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+
+# Scenes driven by the main loop
+STATE_PLAYING = "playing"
+STATE_GAME_OVER = "game_over"  # winner banner
+STATE_MENU = "menu"            # replay options
+
+# Replay menu keys → winning score
+REPLAY_TARGETS = {
+    pygame.K_3: 2,  # Best of 3 → first to 2
+    pygame.K_5: 3,  # Best of 5 → first to 3
+    pygame.K_7: 4,  # Best of 7 → first to 4
+}
 
 # --- Sound files are now expected to be in a 'sounds' directory ---
 SOUND_DIR = os.path.join(os.path.dirname(__file__), "..", "sounds")
 
 
-class GameEngine:
-    def __init__(self, width, height):
-        self.width = width
-        self.height = height
-        self.paddle_width = 10
-        self.paddle_height = 100
+class GameEngine(Simulation):
+    """
+    Wraps the headless Simulation with keyboard input, rendering and sound.
+    """
+    __slots__ = ("inputs", "state", "state_timer", "banner_time", "quit_requested", "recorder",
+                 "prev_ball_x", "prev_ball_y", "prev_player_y", "prev_ai_y",
+                 "court_border", "font", "text", "score_digits",
+                 "sound_paddle", "sound_wall", "sound_score",
+                 "perf", "show_perf", "_perf_overlay", "_overlay_rect",
+                 "_background", "_dirty_state", "_frame_rects", "_dirty_rect_sets",
+                 "_drawn_rects", "_drawn_scores", "_score_rects")
 
-        self.player = Paddle(10, height // 2 - 50, self.paddle_width, self.paddle_height)
-        self.ai = Paddle(width - 20, height // 2 - 50, self.paddle_width, self.paddle_height)
-        self.ball = Ball(width // 2, height // 2, 7, 7, width, height)
-
-        self.player_score = 0
-        self.ai_score = 0
+    def __init__(self, width, height, collision=COLLISION_DISCRETE, banner_time=2.0, seed=None):
+        super().__init__(width, height, collision, seed)
+        self.inputs = 0
+        self.state = STATE_PLAYING
+        self.state_timer = 0.0
+        self.banner_time = banner_time  # seconds; 0 skips the winner banner
+        self.quit_requested = False
+        self.recorder = None  # optional replay.ReplayRecorder
+        self._dirty_state = None  # scene shown by the last render_dirty() call
+        self._background = None   # cached court surface, see background()
+        self.court_border = False
+        self.perf = None           # optional perf.FrameStats, filled in by the main loop
+        self.show_perf = False     # F3 toggles the overlay
+        self._perf_overlay = None
+        self._overlay_rect = None  # where the overlay was drawn last frame
+        # Reusable player/AI/ball rects: one set for render(), and two that
+        # render_dirty() alternates between so last frame's stay intact
+        self._frame_rects, *self._dirty_rect_sets = (
+            tuple(pygame.Rect(0, 0, 0, 0) for _ in range(3)) for _ in range(3))
+        self._drawn_rects = None
+        self._save_previous()
         self.font = pygame.font.SysFont("Arial", 30)
-        self.target_score = 5  # default winning score
+        self.text = TextCache(self.font)
+        self.score_digits = DigitAtlas(self.font, WHITE)
 
         # 🎵 Load sound effects locally
         # If any file is missing, a warning is printed and the game runs without sound.
@@ -47,130 +83,229 @@ class GameEngine:
 
     def handle_input(self):
         keys = pygame.key.get_pressed()
+        self.inputs = 0
         if keys[pygame.K_w]:
-            self.player.move(-10, self.height)
+            self.inputs |= INPUT_UP
         if keys[pygame.K_s]:
-            self.player.move(10, self.height)
-
-    def update(self):
-        # Save current velocities to detect bounce later
-        prev_vx, prev_vy = self.ball.velocity_x, self.ball.velocity_y
-
-        # Move the ball first
-        self.ball.move()
-
-        # Immediately check for paddle collisions
-        if self.ball.rect().colliderect(self.player.rect()):
-            self.ball.x = self.player.x + self.player.width  # reposition to avoid overlap
-            self.ball.velocity_x *= -1
-        elif self.ball.rect().colliderect(self.ai.rect()):
-            self.ball.x = self.ai.x - self.ball.width  # reposition to avoid overlap
-            self.ball.velocity_x *= -1
-
-        # Wall bounce
-        if self.ball.y <= 0 or self.ball.y + self.ball.height >= self.height:
-            self.ball.velocity_y *= -1
-
-        # Scoring
-        if self.ball.x <= 0:
-            self.ai_score += 1
-            if self.sound_score:
-                self.sound_score.play()
-            self.ball.reset()
-        elif self.ball.x >= self.width:
-            self.player_score += 1
+            self.inputs |= INPUT_DOWN
+
+    def update(self, dt=None):
+        """Runs one simulation tick of `dt` seconds (None means one 60 Hz frame)."""
+        self._save_previous()
+        if self.recorder is not None:
+            self.recorder.record(self.inputs)
+        prof = self.profiler
+        if prof is not None:
+            start = prof.clock()
+        events = self.step(self.inputs, dt)
+        if events & EVENT_SCORE:
+            self._save_previous()  # the ball was teleported, don't interpolate
+        if prof is not None:
+            start = prof.record(SPAN_STEP, start)
+        self.play_sounds(events)
+        if prof is not None:
+            prof.record(SPAN_SOUND, start)
+
+    def play_sounds(self, events):
+        """Plays the sound effects for a Simulation.step() event bitmask."""
+        if events & EVENT_SCORE:
             if self.sound_score:
                 self.sound_score.play()
-            self.ball.reset()
-
-        # Play sounds based on what changed
-        if self.ball.velocity_x != prev_vx:
+        if events & EVENT_PADDLE_HIT:
             if self.sound_paddle:
                 self.sound_paddle.play()
-        elif self.ball.velocity_y != prev_vy:
+        elif events & EVENT_WALL_BOUNCE:
             if self.sound_wall:
                 self.sound_wall.play()
 
-        # Finally, move AI
-        self.ai.auto_track(self.ball, self.height)
+    def reset_match(self, seed=None):
+        super().reset_match(seed)
+        self._save_previous()
 
-    def render(self, screen):
-        # Draw paddles and ball
-        pygame.draw.rect(screen, WHITE, self.player.rect())
-        pygame.draw.rect(screen, WHITE, self.ai.rect())
-        pygame.draw.ellipse(screen, WHITE, self.ball.rect())
-        pygame.draw.aaline(screen, WHITE, (self.width//2, 0), (self.width//2, self.height))
+    def restore(self, buffer, offset=0):
+        super().restore(buffer, offset)
+        self._save_previous()
+
+    def _save_previous(self):
+        # Positions at the start of the current tick, used by render() to interpolate
+        self.prev_ball_x, self.prev_ball_y = self.ball.x, self.ball.y
+        self.prev_player_y, self.prev_ai_y = self.player.y, self.ai.y
+
+    def render(self, screen, alpha=1.0):
+        """
+        Draws the current scene. `alpha` (0..1) is how far the render time
+        lies between the previous and the current simulation tick.
+        """
+        if self.state == STATE_GAME_OVER:
+            screen.fill(BLACK)
+            self.render_game_over(screen)
+        elif self.state == STATE_MENU:
+            screen.fill(BLACK)
+            self.render_replay_menu(screen)
+        else:
+            self.render_game(screen, alpha)
+        self._overlay_rect = self.render_perf(screen)
+
+    def render_perf(self, screen):
+        """Draws the performance overlay if it is on; returns its rect or None."""
+        if not self.show_perf or self.perf is None:
+            return None
+        if self._perf_overlay is None or self._perf_overlay.stats is not self.perf:
+            self._perf_overlay = PerfOverlay(self.perf, pygame.font.SysFont("Arial", 14))
+        return self._perf_overlay.draw(screen)
+
+    def background(self, screen):
+        """
+        Returns the static court (fill, net, optional border) pre-rendered for
+        the size of `screen`. It is rebuilt only when that size changes.
+        """
+        size = screen.get_size()
+        if self._background is None or self._background.get_size() != size:
+            width, height = size
+            surface = pygame.Surface(size).convert(screen)
+            surface.fill(BLACK)
+            pygame.draw.aaline(surface, WHITE, (width//2, 0), (width//2, height))
+            if self.court_border:
+                pygame.draw.rect(surface, WHITE, surface.get_rect(), 2)
+            self._background = surface
+        return self._background
+
+    def invalidate_background(self):
+        """Forces background() to rebuild, e.g. after the window was resized."""
+        self._background = None
+        self._dirty_state = None
+
+    def render_game(self, screen, alpha=1.0):
+        screen.blit(self.background(screen), (0, 0))
+        self._draw_court(screen, self._court_rects(alpha, self._frame_rects))
 
         # Draw score
-        player_text = self.font.render(str(self.player_score), True, WHITE)
-        ai_text = self.font.render(str(self.ai_score), True, WHITE)
-        screen.blit(player_text, (self.width//4, 20))
-        screen.blit(ai_text, (self.width * 3//4, 20))
-
-    def check_game_over(self, screen):
-        winner_text = None
-        if self.player_score >= self.target_score:
-            winner_text = "Player Wins!"
-        elif self.ai_score >= self.target_score:
-            winner_text = "AI Wins!"
-
-        if winner_text:
-            # Fill screen black and show winner message
-            screen.fill((0, 0, 0))
-            text_surface = self.font.render(winner_text, True, (255, 255, 255))
-            text_rect = text_surface.get_rect(center=(self.width // 2, self.height // 2))
-            screen.blit(text_surface, text_rect)
-            pygame.display.flip()
-
-            # Pause so players can see the result
-            time.sleep(2)
-
-            # Show replay options instead of quitting immediately
-            self.show_replay_menu(screen)
-
-    def show_replay_menu(self, screen):
+        self._score_rects = (
+            self.score_digits.blit(screen, self.player_score, (self.width//4, 20)),
+            self.score_digits.blit(screen, self.ai_score, (self.width * 3//4, 20)),
+        )
+
+    def render_dirty(self, screen, alpha=1.0):
+        """
+        Like render(), but assumes `screen` still holds the previous frame and
+        only erases and redraws the paddles, ball, changed scores and the
+        performance overlay. Returns the list of rects to pass to pygame.display.update().
+        """
+        if self.state != STATE_PLAYING or self._dirty_state != STATE_PLAYING:
+            # Scene changed (or not in play): redraw everything once
+            self._dirty_state = self.state
+            self.render(screen, alpha)
+            self._drawn_rects = self._court_rects(alpha, self._spare_rects())
+            self._drawn_scores = (self.player_score, self.ai_score)
+            return [screen.get_rect()]
+
+        rects = self._court_rects(alpha, self._spare_rects())
+        scores = (self.player_score, self.ai_score)
+        background = self.background(screen)
+        for old in self._drawn_rects:
+            screen.blit(background, old, old)
+        dirty = [old.union(new) for old, new in zip(self._drawn_rects, rects)]
+        if self._overlay_rect is not None:
+            # Redrawn (or erased, if switched off) every frame
+            screen.blit(background, self._overlay_rect, self._overlay_rect)
+            dirty.append(self._overlay_rect)
+
+        # Scores are drawn on top, so redraw them if they changed or the ball touches them
+        redraw_scores = scores != self._drawn_scores or any(
+            score.collidelist(dirty) != -1 for score in self._score_rects)
+        if redraw_scores:
+            for old in self._score_rects:
+                screen.blit(background, old, old)
+            dirty.extend(self._score_rects)
+
+        self._draw_court(screen, rects)
+        if redraw_scores:
+            self._score_rects = (
+                self.score_digits.blit(screen, self.player_score, (self.width//4, 20)),
+                self.score_digits.blit(screen, self.ai_score, (self.width * 3//4, 20)),
+            )
+            dirty.extend(self._score_rects)
+
+        self._overlay_rect = self.render_perf(screen)
+        if self._overlay_rect is not None:
+            dirty.append(self._overlay_rect)
+        self._drawn_rects = rects
+        self._drawn_scores = scores
+        return dirty
+
+    def _spare_rects(self):
+        first, second = self._dirty_rect_sets
+        return second if self._drawn_rects is first else first
+
+    def _court_rects(self, alpha, rects):
+        """
+        Sets `rects` (player, AI, ball) to the positions interpolated `alpha`
+        of the way into the tick, in place, and returns them.
+        """
+        def lerp(a, b):
+            return a + (b - a) * alpha
+
+        player_rect, ai_rect, ball_rect = rects
+        player, ai, ball = self.player, self.ai, self.ball
+        player_rect.update(player.x, lerp(self.prev_player_y, player.y), player.width, player.height)
+        ai_rect.update(ai.x, lerp(self.prev_ai_y, ai.y), ai.width, ai.height)
+        ball_rect.update(lerp(self.prev_ball_x, ball.x), lerp(self.prev_ball_y, ball.y),
+                         ball.width, ball.height)
+        return rects
+
+    def _draw_court(self, screen, rects):
+        # Draw paddles and ball
+        player_rect, ai_rect, ball_rect = rects
+        pygame.draw.rect(screen, WHITE, player_rect)
+        pygame.draw.rect(screen, WHITE, ai_rect)
+        pygame.draw.ellipse(screen, WHITE, ball_rect)
+
+    def check_game_over(self, dt):
+        """
+        Advances the game-over / menu state machine by `dt` seconds.
+        Called once per frame from the main loop; never blocks.
+        """
+        if self.state == STATE_PLAYING:
+            if self.winner():
+                self.state = STATE_GAME_OVER
+                self.state_timer = self.banner_time
+        if self.state == STATE_GAME_OVER:
+            # Show the winner for banner_time seconds, then the replay menu
+            self.state_timer -= dt
+            if self.state_timer <= 0:
+                self.state = STATE_MENU
+
+    def handle_event(self, event):
+        """Handles a pygame event: F3 toggles the performance overlay, the rest is the replay menu."""
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.show_perf = not self.show_perf
+            return
+        if self.state != STATE_MENU or event.type != pygame.KEYDOWN:
+            return
+        if event.key in REPLAY_TARGETS:
+            self.target_score = REPLAY_TARGETS[event.key]
+            self.reset_match()
+            self.state = STATE_PLAYING
+        elif event.key == pygame.K_ESCAPE:
+            self.quit_requested = True
+
+    def render_game_over(self, screen):
+        winner_text = "Player Wins!" if self.winner() == "player" else "AI Wins!"
+        text_surface = self.text.render(winner_text, WHITE)
+        text_rect = text_surface.get_rect(center=(self.width // 2, self.height // 2))
+        screen.blit(text_surface, text_rect)
+
+    def render_replay_menu(self, screen):
         """Display replay options: Best of 3 / 5 / 7 / Exit."""
-        menu_running = True
-
-        while menu_running:
-            screen.fill((0, 0, 0))
-            title = self.font.render("Play Again? Choose Best of:", True, WHITE)
-            opt3 = self.font.render("3 - Best of 3", True, WHITE)
-            opt5 = self.font.render("5 - Best of 5", True, WHITE)
-            opt7 = self.font.render("7 - Best of 7", True, WHITE)
-            exit_opt = self.font.render("ESC - Exit", True, WHITE)
-
-            # Draw menu items
-            screen.blit(title, (self.width // 2 - 180, self.height // 2 - 100))
-            screen.blit(opt3, (self.width // 2 - 100, self.height // 2 - 40))
-            screen.blit(opt5, (self.width // 2 - 100, self.height // 2))
-            screen.blit(opt7, (self.width // 2 - 100, self.height // 2 + 40))
-            screen.blit(exit_opt, (self.width // 2 - 100, self.height // 2 + 100))
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    quit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_3:
-                        self.target_score = 2  # Best of 3 → first to 2
-                        menu_running = False
-                    elif event.key == pygame.K_5:
-                        self.target_score = 3  # Best of 5 → first to 3
-                        menu_running = False
-                    elif event.key == pygame.K_7:
-                        self.target_score = 4  # Best of 7 → first to 4
-                        menu_running = False
-                    elif event.key == pygame.K_ESCAPE:
-                        pygame.quit()
-                        quit()
-
-            pygame.time.delay(100)
-
-        # Reset game state for replay
-        self.player_score = 0
-        self.ai_score = 0
-        self.ball.reset()
-        self.player.y = self.height // 2 - self.paddle_height // 2
-        self.ai.y = self.height // 2 - self.paddle_height // 2
+        title = self.text.render("Play Again? Choose Best of:", WHITE)
+        opt3 = self.text.render("3 - Best of 3", WHITE)
+        opt5 = self.text.render("5 - Best of 5", WHITE)
+        opt7 = self.text.render("7 - Best of 7", WHITE)
+        exit_opt = self.text.render("ESC - Exit", WHITE)
+
+        # Draw menu items
+        screen.blit(title, (self.width // 2 - 180, self.height // 2 - 100))
+        screen.blit(opt3, (self.width // 2 - 100, self.height // 2 - 40))
+        screen.blit(opt5, (self.width // 2 - 100, self.height // 2))
+        screen.blit(opt7, (self.width // 2 - 100, self.height // 2 + 40))
+        screen.blit(exit_opt, (self.width // 2 - 100, self.height // 2 + 100))
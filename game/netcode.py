@@ -0,0 +1,286 @@
+"""
+Peer-to-peer rollback netcode over UDP.
+
+Each peer simulates every frame immediately, predicting that the remote
+player keeps pressing whatever they pressed last. When the real remote
+inputs arrive and differ from the prediction, the session restores the
+snapshot taken before the first wrong frame and re-simulates up to the
+present. Snapshots live in a ring buffer of Simulation.snapshot() states.
+
+Try it with two local processes and a bad simulated network:
+
+    python -m game.netcode --loopback-test --latency 0.08 --loss 0.2
+"""
+import argparse
+import heapq
+import random
+import socket
+import struct
+import subprocess
+import sys
+import time
+import zlib
+
+from .simulation import Simulation, STATE, BASE_TICK_RATE
+
+# session key, first frame in packet, input count, frames of the receiver's inputs we hold
+PACKET_HEADER = struct.Struct("<IIBI")
+MAX_PACKET_INPUTS = 255
+
+DEFAULT_INPUT_DELAY = 2  # frames; hides small latencies without any rollback
+DEFAULT_MAX_ROLLBACK = 10
+
+
+class SessionMismatch(Exception):
+    """The peer simulates a different match (another seed or tick length)."""
+
+
+def session_key(seed, dt):
+    """Checksum of what both peers must agree on; sent in every packet."""
+    return zlib.crc32(struct.pack("<Qd", seed, 1.0 / BASE_TICK_RATE if dt is None else dt))
+
+
+class Channel:
+    """
+    Non-blocking UDP link to one peer, with optional simulated latency
+    (seconds, one way) and packet loss (0..1) for testing.
+    """
+
+    def __init__(self, port, peer, latency=0.0, loss=0.0, seed=None, host="127.0.0.1"):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.peer = (socket.gethostbyname(peer[0]), peer[1])  # as recvfrom() reports it
+        self.latency = latency
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self._queue = []  # (send time, sequence, datagram) held back for latency
+        self._sequence = 0
+
+    def send(self, data):
+        if self.loss and self.rng.random() < self.loss:
+            return
+        if self.latency:
+            self._sequence += 1
+            heapq.heappush(self._queue, (time.perf_counter() + self.latency, self._sequence, data))
+        else:
+            self._send_now(data)
+
+    def flush(self):
+        """Sends the delayed datagrams whose latency has elapsed."""
+        now = time.perf_counter()
+        while self._queue and self._queue[0][0] <= now:
+            self._send_now(heapq.heappop(self._queue)[2])
+
+    def _send_now(self, data):
+        try:
+            self.sock.sendto(data, self.peer)
+        except OSError:
+            pass  # peer not up yet or gone; UDP is lossy anyway
+
+    def receive(self):
+        """Returns all datagrams from the peer that have arrived, without blocking."""
+        packets = []
+        while True:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                return packets
+            if address == self.peer:  # the socket listens on all interfaces
+                packets.append(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class RollbackSession:
+    """
+    Drives `sim` for one side of a two-player match.
+    `side` 0 controls the left (player) paddle, 1 the right paddle.
+    """
+
+    def __init__(self, sim, side, channel, dt=None,
+                 input_delay=DEFAULT_INPUT_DELAY, max_rollback=DEFAULT_MAX_ROLLBACK):
+        self.sim = sim
+        self.side = side
+        self.channel = channel
+        self.dt = dt
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+        self.key = session_key(sim.seed, dt)
+
+        self.frame = 0                # next frame to simulate
+        self.local_inputs = bytearray(input_delay)  # by frame; first frames are idle
+        self.remote_inputs = bytearray()            # confirmed, by frame
+        self.used_remote = bytearray()              # what each simulated frame assumed
+        self.peer_has = 0             # how many of our inputs the peer confirmed
+        self.rollbacks = 0
+        self.resimulated = 0
+
+        # Ring of states before each of the last `ring_size` frames
+        self.ring_size = max_rollback + 2
+        self.ring = bytearray(self.ring_size * STATE.size)
+
+    @property
+    def confirmed(self):
+        """Frames for which both players' inputs are known."""
+        return min(len(self.remote_inputs), len(self.local_inputs))
+
+    def advance(self, local_input):
+        """
+        Adds this frame's local input and simulates one frame.
+        Returns the frame's event bitmask, or None when the session has to
+        wait because the peer is more than `max_rollback` frames behind.
+        """
+        self.poll()
+        if self.frame - len(self.remote_inputs) >= self.max_rollback:
+            self._send()  # the peer may be waiting for us too
+            return None
+        self.local_inputs.append(local_input)
+        events = self._simulate(self.frame)
+        self.frame += 1
+        self._send()
+        return events
+
+    def poll(self):
+        """
+        Receives remote inputs, rolling back if a prediction was wrong.
+        Raises SessionMismatch if the peer plays with another seed or tick rate.
+        """
+        self.channel.flush()
+        first_wrong = None
+        for packet in self.channel.receive():
+            if len(packet) < PACKET_HEADER.size:
+                continue  # not one of ours
+            key, start, count, peer_has = PACKET_HEADER.unpack_from(packet)
+            if len(packet) != PACKET_HEADER.size + count:
+                continue
+            if key != self.key:
+                raise SessionMismatch("the peer uses a different --seed or --tick-rate")
+            self.peer_has = max(self.peer_has, peer_has)
+            known = len(self.remote_inputs)
+            if start > known:
+                continue  # gap: wait for a packet that covers it
+            new = packet[PACKET_HEADER.size + known - start:PACKET_HEADER.size + count]
+            for frame, inputs in enumerate(new, known):
+                if frame < self.frame and first_wrong is None and inputs != self.used_remote[frame]:
+                    first_wrong = frame
+            self.remote_inputs += new
+
+        if first_wrong is not None:
+            self._rollback(first_wrong)
+
+    def _rollback(self, frame):
+        self.rollbacks += 1
+        self.sim.restore(self.ring, (frame % self.ring_size) * STATE.size)
+        for resim in range(frame, self.frame):
+            self._simulate(resim)
+            self.resimulated += 1
+
+    def _simulate(self, frame):
+        self.sim.snapshot(self.ring, (frame % self.ring_size) * STATE.size)
+        if frame < len(self.remote_inputs):
+            remote = self.remote_inputs[frame]
+        else:
+            remote = self.remote_inputs[-1] if self.remote_inputs else 0  # prediction
+        if frame < len(self.used_remote):
+            self.used_remote[frame] = remote
+        else:
+            self.used_remote.append(remote)
+
+        local = self.local_inputs[frame]
+        if self.side == 0:
+            return self.sim.step(local, self.dt, remote)
+        return self.sim.step(remote, self.dt, local)
+
+    def _send(self):
+        # Resend everything the peer has not confirmed yet; covers lost packets
+        start = self.peer_has
+        end = min(len(self.local_inputs), start + MAX_PACKET_INPUTS)
+        packet = PACKET_HEADER.pack(self.key, start, end - start, len(self.remote_inputs))
+        self.channel.send(packet + self.local_inputs[start:end])
+
+    def settle(self, timeout=0.5):
+        """
+        Keeps exchanging inputs without simulating new frames until both
+        sides confirmed everything (or `timeout` passes, e.g. because the
+        peer already left). Returns True if every simulated frame is
+        confirmed locally, i.e. the state can no longer be rolled back.
+        """
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            self.poll()
+            self._send()
+            if self.confirmed >= self.frame and self.peer_has >= len(self.local_inputs):
+                break
+            time.sleep(0.001)
+        return self.confirmed >= self.frame
+
+
+def run_peer(args):
+    """Plays `args.frames` frames against the peer with scripted random inputs."""
+    sim = Simulation(800, 600, seed=args.seed)
+    sim.target_score = 1 << 15  # keep playing for the whole run
+    channel = Channel(args.port, ("127.0.0.1", args.peer_port),
+                      args.latency, args.loss, seed=args.side)
+    session = RollbackSession(sim, args.side, channel)
+    bot = random.Random(args.seed * 2 + args.side)
+
+    dt = 1.0 / BASE_TICK_RATE
+    next_tick = time.perf_counter()
+    stalls = 0
+    local_input = 0
+    while session.frame < args.frames:
+        if session.frame % 20 == 0:
+            local_input = bot.randrange(4)
+        if session.advance(local_input) is None:
+            stalls += 1
+        next_tick += dt
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
+    settled = session.settle()
+    channel.close()
+
+    checksum = zlib.crc32(sim.snapshot())
+    print(f"side={args.side} frames={session.frame} settled={settled} rollbacks={session.rollbacks} "
+          f"resimulated={session.resimulated} stalls={stalls} checksum={checksum:08x}")
+    return checksum
+
+
+def loopback_test(args):
+    """Runs both peers as separate processes and checks their final states match."""
+    common = ["--frames", str(args.frames), "--seed", str(args.seed),
+              "--latency", str(args.latency), "--loss", str(args.loss)]
+    peers = [
+        subprocess.Popen([sys.executable, "-m", "game.netcode", "--side", str(side),
+                          "--port", str(args.port + side), "--peer-port", str(args.port + 1 - side)]
+                         + common, stdout=subprocess.PIPE, text=True)
+        for side in (0, 1)
+    ]
+    outputs = [peer.communicate()[0].strip() for peer in peers]
+    for output in outputs:
+        print(output)
+    checksums = {output.rsplit("checksum=", 1)[-1] for output in outputs}
+    print("in sync" if len(checksums) == 1 else "DESYNC")
+    return len(checksums) == 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rollback netcode loopback demo")
+    parser.add_argument("--loopback-test", action="store_true",
+                        help="run both peers as local processes and compare their states")
+    parser.add_argument("--side", type=int, choices=(0, 1), default=0)
+    parser.add_argument("--port", type=int, default=47000)
+    parser.add_argument("--peer-port", type=int, default=47001)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated one-way latency (s)")
+    parser.add_argument("--loss", type=float, default=0.0, help="simulated packet loss (0..1)")
+    args = parser.parse_args()
+
+    if args.loopback_test:
+        sys.exit(0 if loopback_test(args) else 1)
+    run_peer(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,28 @@
-import pygame
-
 class Paddle:
+    __slots__ = ("x", "y", "width", "height", "speed", "_rect")
+
     def __init__(self, x, y, width, height):
         self.x = x
         self.y = y
         self.width = width
         self.height = height
         self.speed = 7
+        self._rect = None  # pygame.Rect reused by rect()
 
     def move(self, dy, screen_height):
         self.y += dy
         self.y = max(0, min(self.y, screen_height - self.height))
 
     def rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        """The paddle's bounds as a pygame.Rect, reused and updated in place on every call."""
+        if self._rect is None:
+            import pygame  # only needed for rendering; the rules run without it
+            self._rect = pygame.Rect(0, 0, 0, 0)
+        self._rect.update(self.x, self.y, self.width, self.height)
+        return self._rect
 
-    def auto_track(self, ball, screen_height):
+    def auto_track(self, ball, screen_height, scale=1.0):
         if ball.y < self.y:
-            self.move(-self.speed, screen_height)
+            self.move(-self.speed * scale, screen_height)
         elif ball.y > self.y + self.height:
-            self.move(self.speed, screen_height)
+            self.move(self.speed * scale, screen_height)
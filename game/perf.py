@@ -0,0 +1,114 @@
+"""
+Frame timing statistics and the in-game performance overlay (F3).
+
+main.main() times each phase of every frame with time.perf_counter_ns()
+and hands the numbers to FrameStats.add(); GameEngine.render() draws a
+PerfOverlay of the current FPS, a rolling frame-time graph and per-phase
+p50/p95/p99 when `show_perf` is on.
+"""
+from array import array
+
+import pygame
+
+PHASES = ("input", "update", "render", "flip")
+HISTORY = 240  # frames kept for the graph and the percentiles
+
+GRAPH_HEIGHT = 50
+GRAPH_MAX_MS = 50.0          # top of the graph
+FRAME_BUDGET_MS = 1000 / 60  # reference line
+REFRESH_FRAMES = 15          # text is re-rendered this often
+
+WHITE = (255, 255, 255)
+GREEN = (0, 200, 0)
+RED = (230, 40, 40)
+GREY = (90, 90, 90)
+PANEL = (0, 0, 0, 190)
+
+
+class FrameStats:
+    """The last `size` frame times and phase times, in nanoseconds, in ring buffers."""
+
+    def __init__(self, size=HISTORY):
+        self.size = size
+        self.frame_times = array("q", bytes(8 * size))
+        self.phase_times = {phase: array("q", bytes(8 * size)) for phase in PHASES}
+        self.count = 0  # frames recorded in total
+
+    def add(self, frame_ns, phase_ns):
+        """Records one frame; `phase_ns` holds one duration per PHASES entry."""
+        index = self.count % self.size
+        self.frame_times[index] = frame_ns
+        for phase, ns in zip(PHASES, phase_ns):
+            self.phase_times[phase][index] = ns
+        self.count += 1
+
+    def recent(self, times):
+        """The filled part of a ring buffer, oldest first."""
+        if self.count < self.size:
+            return times[:self.count]
+        index = self.count % self.size
+        return times[index:] + times[:index]
+
+    def fps(self):
+        times = self.recent(self.frame_times)
+        total = sum(times)
+        return len(times) * 1e9 / total if total else 0.0
+
+    def percentiles(self, phase, points=(50, 95, 99)):
+        """Nearest-rank percentiles of a phase, in milliseconds."""
+        times = sorted(self.recent(self.phase_times[phase]))
+        if not times:
+            return tuple(0.0 for _ in points)
+        return tuple(times[min(len(times) - 1, len(times) * p // 100)] / 1e6 for p in points)
+
+
+class PerfOverlay:
+    """Draws FrameStats in a translucent panel in the bottom-left corner."""
+
+    def __init__(self, stats, font):
+        self.stats = stats
+        self.font = font
+        self.line_height = font.get_linesize()
+        self.width = stats.size + 20
+        self.height = GRAPH_HEIGHT + self.line_height * (len(PHASES) + 2) + 20
+        self.panel = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        self._lines = []
+        self._refreshed = None
+
+    def rect(self, screen):
+        return pygame.Rect(10, screen.get_height() - self.height - 10, self.width, self.height)
+
+    def draw(self, screen):
+        """Draws the overlay and returns the rect it covers."""
+        stats = self.stats
+        if self._refreshed is None or stats.count - self._refreshed >= REFRESH_FRAMES:
+            self._refreshed = stats.count
+            text = [f"{stats.fps():5.1f} fps",
+                    f"{'ms':<8}{'p50':>7}{'p95':>7}{'p99':>7}"]
+            text += [f"{phase:<8}" + "".join(f"{ms:7.2f}" for ms in stats.percentiles(phase))
+                     for phase in PHASES]
+            self._lines = [self.font.render(line, True, WHITE) for line in text]
+
+        panel = self.panel
+        panel.fill(PANEL)
+        y = 10
+        for line in self._lines:
+            panel.blit(line, (10, y))
+            y += self.line_height
+
+        # Frame-time graph, newest frame on the right
+        bottom = y + GRAPH_HEIGHT
+        scale = GRAPH_HEIGHT / GRAPH_MAX_MS
+        budget_y = bottom - FRAME_BUDGET_MS * scale
+        pygame.draw.line(panel, GREY, (10, budget_y), (10 + stats.size, budget_y))
+        times = stats.recent(stats.frame_times)
+        if len(times) > 1:
+            x0 = 10 + stats.size - len(times)
+            points = [(x0 + i, bottom - min(ns / 1e6, GRAPH_MAX_MS) * scale)
+                      for i, ns in enumerate(times)]
+            slow = times[-1] / 1e6 > FRAME_BUDGET_MS * 1.5
+            pygame.draw.lines(panel, RED if slow else GREEN, False, points)
+
+        rect = self.rect(screen)
+        screen.blit(panel, rect)
+        return rect
@@ -0,0 +1,84 @@
+"""
+Span profiling for the game loop, exported as Chrome trace-event JSON.
+
+Instrumented code holds an optional Profiler and guards every hook with
+`if profiler is not None`, so with profiling off (the default) a hook
+costs one comparison and no call:
+
+    prof = self.profiler
+    if prof is not None:
+        start = prof.clock()
+    ...collide...
+    if prof is not None:
+        start = prof.record(SPAN_COLLISION, start)   # returns the end time
+
+Spans go into fixed-size ring buffers (the oldest are overwritten) and
+are also passed to any `listeners`. Open the exported file in
+chrome://tracing or https://ui.perfetto.dev.
+"""
+import json
+import os
+import threading
+import time
+from array import array
+
+# Loop phases (main.main())
+SPAN_INPUT = "input"
+SPAN_UPDATE = "update"
+SPAN_RENDER = "render"
+SPAN_FLIP = "flip"
+# Inside GameEngine.update() / Simulation.step()
+SPAN_STEP = "step"
+SPAN_COLLISION = "collision"
+SPAN_SCORING = "scoring"
+SPAN_AI = "ai"
+SPAN_SOUND = "sound"
+
+DEFAULT_CAPACITY = 1 << 16
+
+
+class Profiler:
+    """Records (name, start, duration) spans in nanoseconds of time.perf_counter_ns()."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.names = [None] * capacity
+        self.starts = array("q", bytes(8 * capacity))
+        self.durations = array("q", bytes(8 * capacity))
+        self.count = 0       # spans recorded in total
+        self.listeners = []  # callables(name, start_ns, duration_ns)
+        self.clock = time.perf_counter_ns
+
+    def add(self, name, start, duration):
+        index = self.count % self.capacity
+        self.names[index] = name
+        self.starts[index] = start
+        self.durations[index] = duration
+        self.count += 1
+        for listener in self.listeners:
+            listener(name, start, duration)
+
+    def record(self, name, start):
+        """Adds a span from `start` until now; returns now, to start the next span."""
+        end = self.clock()
+        self.add(name, start, end - start)
+        return end
+
+    def spans(self):
+        """The spans still in the ring, oldest first, as (name, start, duration)."""
+        first = max(0, self.count - self.capacity)
+        return [(self.names[i % self.capacity], self.starts[i % self.capacity],
+                 self.durations[i % self.capacity]) for i in range(first, self.count)]
+
+    def chrome_trace(self):
+        """The spans as a Chrome trace-event document (complete "X" events, in µs)."""
+        pid, tid = os.getpid(), threading.get_ident()
+        return {
+            "traceEvents": [{"name": name, "ph": "X", "ts": start / 1000, "dur": duration / 1000,
+                             "pid": pid, "tid": tid} for name, start, duration in self.spans()],
+            "displayTimeUnit": "ms",
+        }
+
+    def export_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
@@ -0,0 +1,156 @@
+"""
+Delta-compressed, quantized state messages for spectators.
+
+A message carries the tick it describes, how many ticks older the
+baseline it was encoded against is, and a bitmask of the fields that
+differ from that baseline, followed by only those fields. The baseline is
+the newest state the receiver has acknowledged, so lost messages never
+break decoding; a message without a baseline (age 0) contains every field
+and is used for the first message and for resyncs.
+
+The ball moves in straight lines between bounces, so its position is
+compared against the baseline extrapolated by the baseline velocity
+rather than against the baseline itself, and is only sent after a bounce
+or reset.
+
+Positions are sent in 1/8 px and velocities in 1/64 px per frame as int16,
+scores as uint8.
+"""
+import struct
+from collections import namedtuple
+
+FIELDS = ("ball_x", "ball_y", "ball_vx", "ball_vy", "player_y", "ai_y", "player_score", "ai_score")
+FIELD_STRUCTS = [struct.Struct(fmt) for fmt in ("<h", "<h", "<h", "<h", "<h", "<h", "<B", "<B")]
+FULL_MASK = (1 << len(FIELDS)) - 1
+
+POSITION_SCALE = 8
+VELOCITY_SCALE = 64
+
+HEADER = struct.Struct("<IBB")  # tick, baseline age in ticks (0 = none), changed-field mask
+MAX_BASELINE_AGE = 255
+MAX_MESSAGE_SIZE = HEADER.size + sum(s.size for s in FIELD_STRUCTS)
+
+State = namedtuple("State", FIELDS)
+
+
+def quantize(sim):
+    """Returns the wire values (a tuple of ints in FIELDS order) for a Simulation."""
+    ball = sim.ball
+    return (round(ball.x * POSITION_SCALE), round(ball.y * POSITION_SCALE),
+            round(ball.velocity_x * VELOCITY_SCALE), round(ball.velocity_y * VELOCITY_SCALE),
+            round(sim.player.y * POSITION_SCALE), round(sim.ai.y * POSITION_SCALE),
+            sim.player_score, sim.ai_score)
+
+
+def predict(base, age):
+    """
+    The baseline `age` ticks later, with the ball moved along its velocity.
+    Integer arithmetic, so sender and receiver predict exactly the same.
+    """
+    steps = VELOCITY_SCALE // POSITION_SCALE
+    return (base[0] + base[2] * age // steps, base[1] + base[3] * age // steps) + tuple(base[2:])
+
+
+def dequantize(values):
+    """Turns wire values back into a State in pixels / points."""
+    return State(values[0] / POSITION_SCALE, values[1] / POSITION_SCALE,
+                 values[2] / VELOCITY_SCALE, values[3] / VELOCITY_SCALE,
+                 values[4] / POSITION_SCALE, values[5] / POSITION_SCALE,
+                 values[6], values[7])
+
+
+class DeltaEncoder:
+    """Sender side for one receiver (or a group sharing the same acks)."""
+
+    def __init__(self, history=64):
+        self.history = min(history, MAX_BASELINE_AGE)
+        self.sent = {}  # tick -> values, oldest first
+        self.baseline = None
+
+    def ack(self, tick):
+        """Marks `tick` as received, making it the baseline for later messages."""
+        if tick in self.sent and (self.baseline is None or tick > self.baseline):
+            self.baseline = tick
+            for old in [t for t in self.sent if t < tick]:
+                del self.sent[old]
+
+    def resync(self):
+        """Sends every field in the next message, e.g. after the receiver lost its baseline."""
+        self.baseline = None
+
+    def forget(self, tick):
+        """Drops an encoded message that was never sent, so it can't become a baseline."""
+        self.sent.pop(tick, None)
+
+    def encode_into(self, buffer, offset, tick, values):
+        """Packs the message for `tick` into `buffer` at `offset`; returns the end offset."""
+        base = self.sent.get(self.baseline) if self.baseline is not None else None
+        age = 0
+        if base is not None and 0 < tick - self.baseline <= MAX_BASELINE_AGE:
+            age = tick - self.baseline
+            base = predict(base, age)
+        else:
+            base = None
+        end = offset + HEADER.size
+        mask = 0
+        for bit, value in enumerate(values):
+            if base is None or value != base[bit]:
+                mask |= 1 << bit
+                FIELD_STRUCTS[bit].pack_into(buffer, end, value)
+                end += FIELD_STRUCTS[bit].size
+        HEADER.pack_into(buffer, offset, tick, age, mask)
+
+        self.sent[tick] = values
+        if len(self.sent) > self.history:
+            oldest = next(iter(self.sent))
+            del self.sent[oldest]
+            if oldest == self.baseline:
+                self.baseline = None
+        return end
+
+    def encode(self, tick, values):
+        buffer = bytearray(MAX_MESSAGE_SIZE)
+        return bytes(buffer[:self.encode_into(buffer, 0, tick, values)])
+
+
+class DeltaDecoder:
+    """Receiver side: rebuilds states and remembers them as future baselines."""
+
+    def __init__(self, history=64):
+        self.history = history
+        self.received = {}  # tick -> values, oldest first
+        self.latest = None
+        self.needs_resync = False
+
+    def decode(self, data, offset=0):
+        """
+        Decodes one message. Returns (tick, values), or None if the message
+        is older than the latest state or its baseline is unknown (then
+        `needs_resync` is set and the sender should be asked to resync).
+        """
+        tick, age, mask = HEADER.unpack_from(data, offset)
+        if self.latest is not None and tick <= self.latest:
+            return None  # late or duplicate datagram
+        if age == 0:
+            base = None
+        else:
+            base = self.received.get(tick - age)
+            if base is None:
+                self.needs_resync = True
+                return None
+            base = predict(base, age)
+
+        values = list(base) if base is not None else [0] * len(FIELDS)
+        offset += HEADER.size
+        for bit, field in enumerate(FIELD_STRUCTS):
+            if mask & (1 << bit):
+                (values[bit],) = field.unpack_from(data, offset)
+                offset += field.size
+        values = tuple(values)
+
+        self.needs_resync = False
+        self.latest = tick
+        self.received[tick] = values
+        if len(self.received) > self.history:
+            del self.received[next(iter(self.received))]
+        return tick, values
@@ -0,0 +1,163 @@
+"""
+Input-only match replays.
+
+A replay stores the match settings and seed plus the player's W/S input
+bitmask for every simulation tick, packed 4 ticks per byte. Since the
+Simulation is deterministic, re-running those inputs rebuilds the match
+exactly, either headlessly at full speed or rendered through GameEngine.
+"""
+import argparse
+import struct
+
+from .simulation import Simulation, BASE_TICK_RATE, COLLISION_DISCRETE, COLLISION_SWEPT
+
+MAGIC = b"PONGRPL1"
+COLLISION_MODES = (COLLISION_DISCRETE, COLLISION_SWEPT)
+
+# magic, width, height, seed, collision, target_score, player_score, ai_score,
+# tick_rate, frame_count
+HEADER = struct.Struct("<8sHHQBBBBHI")
+
+
+def pack_inputs(inputs):
+    """Packs a sequence of 2-bit input masks, 4 per byte."""
+    packed = bytearray((len(inputs) + 3) // 4)
+    for i, value in enumerate(inputs):
+        packed[i >> 2] |= (value & 3) << ((i & 3) * 2)
+    return bytes(packed)
+
+
+def unpack_inputs(packed, frame_count):
+    """Inverse of pack_inputs(); returns a bytearray with one mask per frame."""
+    inputs = bytearray(frame_count)
+    for i in range(frame_count):
+        inputs[i] = (packed[i >> 2] >> ((i & 3) * 2)) & 3
+    return inputs
+
+
+class ReplayRecorder:
+    """Records the inputs fed to `sim` from the start of its current match."""
+
+    def __init__(self, sim, tick_rate=BASE_TICK_RATE):
+        if sim.ai_controller is not None or sim.player_controller is not None:
+            raise ValueError("replays only support the built-in AI (Paddle.auto_track)")
+        self.sim = sim
+        self.tick_rate = tick_rate
+        self.seed = sim.seed
+        self.target_score = sim.target_score
+        self.inputs = bytearray()
+
+    def record(self, inputs):
+        self.inputs.append(inputs & 3)
+
+    def to_replay(self):
+        sim = self.sim
+        return Replay(sim.width, sim.height, self.seed, sim.collision, self.target_score,
+                      sim.player_score, sim.ai_score, self.tick_rate, self.inputs)
+
+    def save(self, path):
+        self.to_replay().save(path)
+
+
+class Replay:
+    def __init__(self, width, height, seed, collision, target_score,
+                 player_score, ai_score, tick_rate, inputs):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.collision = collision
+        self.target_score = target_score
+        self.player_score = player_score  # final scores, used by verify()
+        self.ai_score = ai_score
+        self.tick_rate = tick_rate
+        self.inputs = inputs
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, self.width, self.height, self.seed,
+                             COLLISION_MODES.index(self.collision), self.target_score,
+                             self.player_score, self.ai_score, self.tick_rate, len(self.inputs))
+        return header + pack_inputs(self.inputs)
+
+    @classmethod
+    def from_bytes(cls, data):
+        (magic, width, height, seed, collision, target_score,
+         player_score, ai_score, tick_rate, frame_count) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a ping pong replay")
+        inputs = unpack_inputs(memoryview(data)[HEADER.size:], frame_count)
+        return cls(width, height, seed, COLLISION_MODES[collision], target_score,
+                   player_score, ai_score, tick_rate, inputs)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    @property
+    def dt(self):
+        return 1.0 / self.tick_rate
+
+    def new_simulation(self, sim_class=Simulation, **kwargs):
+        """Creates a `sim_class` (Simulation or GameEngine) in the replay's start state."""
+        sim = sim_class(self.width, self.height, self.collision, seed=self.seed, **kwargs)
+        sim.target_score = self.target_score
+        return sim
+
+    def simulate(self):
+        """Re-runs the whole match headlessly as fast as possible; returns the Simulation."""
+        sim = self.new_simulation()
+        step, dt = sim.step, self.dt
+        for inputs in self.inputs:
+            step(inputs, dt)
+        return sim
+
+    def verify(self):
+        """True if re-simulating reproduces the recorded final score."""
+        sim = self.simulate()
+        return (sim.player_score, sim.ai_score) == (self.player_score, self.ai_score)
+
+
+def play(replay, speed=1.0):
+    """Renders a replay in a window, `speed` times faster than real time."""
+    import pygame
+    from .game_engine import GameEngine
+
+    pygame.init()
+    screen = pygame.display.set_mode((replay.width, replay.height))
+    pygame.display.set_caption("Ping Pong - Replay")
+    clock = pygame.time.Clock()
+    engine = replay.new_simulation(GameEngine)
+
+    for inputs in replay.inputs:
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            break
+        engine.inputs = inputs
+        engine.update(replay.dt)
+        engine.render(screen)
+        pygame.display.flip()
+        clock.tick(replay.tick_rate * speed)
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check or watch a ping pong replay")
+    parser.add_argument("path")
+    parser.add_argument("--render", action="store_true", help="show the replay in a window")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed when rendering")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    if args.render:
+        play(replay, args.speed)
+        return
+    status = "OK" if replay.verify() else "MISMATCH"
+    print(f"{len(replay.inputs)} frames, seed {replay.seed}: "
+          f"{replay.player_score}-{replay.ai_score} ({status})")
+
+
+if __name__ == "__main__":
+    main()
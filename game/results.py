@@ -0,0 +1,74 @@
+"""
+Per-match results in shared memory.
+
+Worker processes write one row per match straight into a NumPy structured
+array backed by multiprocessing.shared_memory, so the parent reads the
+results in place instead of unpickling them from every worker.
+
+    results = SharedResults(len(jobs))                   # parent: creates
+    worker = SharedResults(len(jobs), results.name)      # worker: attaches
+    worker.rows[index] = match_stats + (1,)              # the whole row at once
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+RESULT_DTYPE = np.dtype([
+    ("left_score", np.uint16),
+    ("right_score", np.uint16),
+    ("frames", np.uint32),
+    ("points", np.uint16),         # points played
+    ("rallies", np.uint16),        # points plus the rally cut off by a frame limit, if any
+    ("longest_rally", np.uint16),  # paddle hits in the longest rally
+    ("left_hits", np.uint32),
+    ("right_hits", np.uint32),
+    ("wall_bounces", np.uint32),
+    ("done", np.uint8),            # 1 for rows that hold a played match
+])
+
+
+class SharedResults:
+    """
+    `count` result rows in a shared memory block. Without `name` a new
+    zeroed block is created (and unlinked by close()); with `name` an
+    existing one is attached.
+    """
+
+    def __init__(self, count, name=None):
+        self.owner = name is None
+        size = max(1, count * RESULT_DTYPE.itemsize)
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.rows = np.ndarray((count,), dtype=RESULT_DTYPE, buffer=self.shm.buf)
+        if self.owner:
+            self.rows[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def summary(self):
+        """Totals and averages over the completed rows."""
+        rows = self.rows[self.rows["done"] == 1]
+        rallies = int(rows["rallies"].sum())
+        hits = int(rows["left_hits"].sum() + rows["right_hits"].sum())
+        return {
+            "matches": len(rows),
+            "frames": int(rows["frames"].sum()),
+            "points": int(rows["points"].sum()),
+            "rallies": rallies,
+            "hits_per_rally": hits / rallies if rallies else 0.0,
+            "longest_rally": int(rows["longest_rally"].max()) if len(rows) else 0,
+            "wall_bounces": int(rows["wall_bounces"].sum()),
+        }
+
+    def close(self):
+        del self.rows  # release the exported buffer before closing the mapping
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,294 @@
+"""
+Authoritative match server: many headless matches in one asyncio process.
+
+Clients connect over TCP and exchange length-prefixed binary frames:
+
+    client -> server   JOIN                  join the first match with a free slot
+                       SPECTATE <I>          watch a match by id
+                       INPUT  <B>            W/S bitmask for the client's paddle
+                       RESYNC                the client can't decode the stream;
+                                             the next STATE contains every field
+    server -> client   WELCOME <IBQ>         match id, side (0 left / 1 right,
+                                             255 spectator), seed
+                       STATE                 a protocol.py delta message
+
+One scheduler coroutine ticks every match at a fixed rate. Each match's
+state message is packed once per tick into a preallocated buffer and
+written to all of its players and spectators. TCP delivers in order, so
+every message is acknowledged as soon as it is sent and the next one is a
+delta against it. Ticks where nothing changed are not sent at all (and so
+never become a baseline). A right-hand slot without a client is played by the AI.
+"""
+import argparse
+import asyncio
+import random
+import struct
+import time
+
+from .simulation import Simulation, BASE_TICK_RATE
+from .protocol import DeltaEncoder, DeltaDecoder, quantize, HEADER as STATE_HEADER, MAX_MESSAGE_SIZE
+
+MSG_JOIN = 0x01
+MSG_INPUT = 0x02
+MSG_SPECTATE = 0x03
+MSG_RESYNC = 0x04
+MSG_WELCOME = 0x81
+MSG_STATE = 0x82
+
+FRAME_HEADER = struct.Struct("<HB")  # payload length, message type
+WELCOME = struct.Struct("<IBQ")
+INPUT = struct.Struct("<B")
+SPECTATE = struct.Struct("<I")
+SPECTATOR_SIDE = 255
+
+MAX_WRITE_BUFFER = 64 * 1024  # drop clients that stop reading
+
+
+def pack_frame(msg_type, payload_struct, *values):
+    payload = payload_struct.pack(*values) if payload_struct else b""
+    return FRAME_HEADER.pack(len(payload), msg_type) + payload
+
+
+class Match:
+    def __init__(self, match_id, width, height, seed=None):
+        self.id = match_id
+        self.sim = Simulation(width, height, seed=seed)
+        self.clients = [None, None]  # left, right
+        self.inputs = [0, 0]
+        self.spectators = []
+        self.encoder = DeltaEncoder()
+        self.buffer = bytearray(FRAME_HEADER.size + MAX_MESSAGE_SIZE)
+        self.view = memoryview(self.buffer)
+
+    def free_side(self):
+        for side, client in enumerate(self.clients):
+            if client is None:
+                return side
+        return None
+
+    def tick(self, frame, dt):
+        """Steps the match and returns a view of its state message, or None."""
+        sim = self.sim
+        if sim.winner():
+            sim.reset_match()  # one tick after the winning point, so clients see the final score
+        ai_inputs = self.inputs[1] if self.clients[1] is not None else None
+        sim.step(self.inputs[0], dt, ai_inputs)
+
+        end = self.encoder.encode_into(self.buffer, FRAME_HEADER.size, frame, quantize(sim))
+        if end == FRAME_HEADER.size + STATE_HEADER.size:
+            self.encoder.forget(frame)  # nothing changed; not sent
+            return None
+        self.encoder.ack(frame)  # TCP delivers it in order
+        FRAME_HEADER.pack_into(self.buffer, 0, end - FRAME_HEADER.size, MSG_STATE)
+        return self.view[:end]
+
+    def resync(self):
+        """Makes the next message contain every field, e.g. for a new client."""
+        self.encoder.resync()
+
+
+class ClientConnection(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.match = None
+        self.side = None
+        self._buffer = bytearray()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        buffer = self._buffer
+        buffer += data
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            length, msg_type = FRAME_HEADER.unpack_from(buffer, offset)
+            end = offset + FRAME_HEADER.size + length
+            if end > len(buffer):
+                break
+            payload = offset + FRAME_HEADER.size
+            # Frames with the wrong payload size for their type are dropped
+            if msg_type == MSG_INPUT and length == INPUT.size:
+                if self.match is not None and self.side != SPECTATOR_SIDE:
+                    self.match.inputs[self.side] = buffer[payload] & 3
+            elif msg_type == MSG_JOIN and length == 0:
+                if self.match is None:
+                    self.server.join(self)
+            elif msg_type == MSG_SPECTATE and length == SPECTATE.size:
+                if self.match is None:
+                    self.server.spectate(self, SPECTATE.unpack_from(buffer, payload)[0])
+            elif msg_type == MSG_RESYNC and length == 0:
+                if self.match is not None:
+                    self.match.resync()
+            offset = end
+        del buffer[:offset]
+
+    def connection_lost(self, exc):
+        self.server.leave(self)
+
+    def send(self, data):
+        if self.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.transport.close()  # too slow; connection_lost() cleans up
+            return
+        self.transport.write(data)
+
+
+class MatchServer:
+    def __init__(self, width=800, height=600, tick_rate=BASE_TICK_RATE, seed=None):
+        self.width = width
+        self.height = height
+        self.tick_rate = tick_rate
+        self.rng = random.Random(seed)
+        self.matches = {}
+        self._next_match_id = 0
+        self.frame = 0
+        self.tick_times = []  # seconds spent per tick, drained by the stats reporter
+
+    def join(self, client):
+        match = next((m for m in self.matches.values() if m.free_side() is not None), None)
+        if match is None:
+            match = Match(self._next_match_id, self.width, self.height, self.rng.getrandbits(64))
+            self.matches[match.id] = match
+            self._next_match_id += 1
+        side = match.free_side()
+        match.clients[side] = client
+        match.inputs[side] = 0
+        match.resync()
+        client.match, client.side = match, side
+        client.send(pack_frame(MSG_WELCOME, WELCOME, match.id, side, match.sim.seed))
+
+    def spectate(self, client, match_id):
+        match = self.matches.get(match_id)
+        if match is None:
+            client.transport.close()
+            return
+        match.spectators.append(client)
+        match.resync()
+        client.match, client.side = match, SPECTATOR_SIDE
+        client.send(pack_frame(MSG_WELCOME, WELCOME, match.id, SPECTATOR_SIDE, match.sim.seed))
+
+    def leave(self, client):
+        match = client.match
+        if match is None:
+            return
+        client.match = None
+        if client.side == SPECTATOR_SIDE:
+            match.spectators.remove(client)
+            return
+        match.clients[client.side] = None
+        match.inputs[client.side] = 0
+        if match.clients == [None, None]:
+            for spectator in match.spectators:
+                spectator.match = None
+                spectator.transport.close()
+            del self.matches[match.id]
+
+    async def run(self):
+        """Ticks every match at `tick_rate` until cancelled."""
+        loop = asyncio.get_running_loop()
+        dt = 1.0 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            started = time.perf_counter()
+            frame = self.frame
+            for match in self.matches.values():
+                message = match.tick(frame, dt)
+                if message is not None:
+                    # One immutable copy per match: transports may keep a reference
+                    # to unsent data, so the packing buffer itself is not handed out
+                    message = bytes(message)
+                    for client in match.clients:
+                        if client is not None:
+                            client.send(message)
+                    for spectator in match.spectators:
+                        spectator.send(message)
+            self.frame += 1
+            self.tick_times.append(time.perf_counter() - started)
+
+            next_tick += dt
+            delay = next_tick - loop.time()
+            if delay < -0.25:
+                next_tick = loop.time()  # hopelessly behind; don't try to catch up
+            await asyncio.sleep(max(0.0, delay))
+
+    async def report(self, interval=1.0):
+        while True:
+            await asyncio.sleep(interval)
+            times, self.tick_times = self.tick_times, []
+            if times:
+                clients = sum(c is not None for m in self.matches.values() for c in m.clients)
+                print(f"{len(self.matches)} matches, {clients} clients, "
+                      f"tick avg {sum(times) / len(times) * 1000:.3f} ms, "
+                      f"max {max(times) * 1000:.3f} ms")
+
+
+async def bot_client(host, port, seed, stats):
+    """
+    Minimal client: joins, decodes state messages and sends random inputs.
+    Counts decoded and undecodable messages in the `stats` dict, and asks
+    for a resync when it can't decode.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(pack_frame(MSG_JOIN, None))
+    rng = random.Random(seed)
+    decoder = DeltaDecoder()
+    try:
+        while True:
+            length, msg_type = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+            payload = await reader.readexactly(length)
+            if msg_type != MSG_STATE:
+                continue
+            if decoder.decode(payload) is None:
+                stats["undecodable"] += 1
+                if decoder.needs_resync:
+                    writer.write(pack_frame(MSG_RESYNC, None))
+            else:
+                stats["decoded"] += 1
+            if rng.random() < 0.05:
+                writer.write(pack_frame(MSG_INPUT, INPUT, rng.randrange(4)))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(args):
+    server = MatchServer(tick_rate=args.tick_rate, seed=args.seed)
+    loop = asyncio.get_running_loop()
+    listener = await loop.create_server(lambda: ClientConnection(server), args.host, args.port)
+    tasks = [asyncio.create_task(server.run()), asyncio.create_task(server.report())]
+    bot_stats = {"decoded": 0, "undecodable": 0}
+    tasks += [asyncio.create_task(bot_client(args.host, args.port, i, bot_stats))
+              for i in range(args.bots)]
+    print(f"listening on {args.host}:{args.port}")
+    try:
+        if args.duration:
+            await asyncio.sleep(args.duration)
+        else:
+            await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        listener.close()
+        if args.bots:
+            print(f"bots: {bot_stats['decoded']} state messages decoded, "
+                  f"{bot_stats['undecodable']} undecodable")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many ping pong matches")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=47100)
+    parser.add_argument("--tick-rate", type=int, default=BASE_TICK_RATE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bots", type=int, default=0,
+                        help="also connect this many local bot clients (load test)")
+    parser.add_argument("--duration", type=float, default=0,
+                        help="stop after this many seconds (0 = run forever)")
+    args = parser.parse_args()
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
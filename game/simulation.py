@@ -0,0 +1,335 @@
+import random
+import struct
+
+from .paddle import Paddle
+from .ball import Ball
+from .profiling import SPAN_COLLISION, SPAN_SCORING, SPAN_AI
+
+# Input bitmask bits for the player paddle (W / S)
+INPUT_UP = 1
+INPUT_DOWN = 2
+
+# Event bitmask bits returned by Simulation.step()
+EVENT_PADDLE_HIT = 1
+EVENT_WALL_BOUNCE = 2
+EVENT_SCORE = 4
+
+PLAYER_SPEED = 10
+
+# Speeds above are in pixels per frame at this rate; other tick rates scale them
+BASE_TICK_RATE = 60
+
+# Fixed layout used by Simulation.snapshot() / restore():
+# seed, ball x, y, vx, vy, player y, ai y, player score, ai score, target score
+ENTITY_STATE = struct.Struct("<Q6d3H")
+# Mersenne Twister state (624 words + position), gauss_next present flag and value
+RNG_STATE = struct.Struct("<625I?d")
+STATE = struct.Struct("<" + ENTITY_STATE.format[1:] + RNG_STATE.format[1:])
+# Limits of that layout: seeds are unsigned 64-bit, scores and target_score 16-bit
+MAX_SEED = (1 << 64) - 1
+MAX_SCORE = 0xFFFF
+
+# Collision modes
+COLLISION_DISCRETE = "discrete"  # overlap test after moving (original behaviour)
+COLLISION_SWEPT = "swept"        # time-of-impact test along the ball's path
+
+
+class TrackedRandom(random.Random):
+    """
+    random.Random that bumps `version` whenever its state changes (draws,
+    seed(), setstate()), so Simulation can tell when its cached packed RNG
+    state is stale no matter who used the generator (Ball, AI, callers).
+    """
+
+    def __init__(self, seed=None):
+        self.version = 0
+        super().__init__(seed)
+
+    def seed(self, *args, **kwargs):
+        self.version += 1
+        super().seed(*args, **kwargs)
+
+    def setstate(self, state):
+        self.version += 1
+        super().setstate(state)
+
+    def random(self):
+        self.version += 1
+        return super().random()
+
+    def getrandbits(self, k):
+        self.version += 1
+        return super().getrandbits(k)
+
+
+class Simulation:
+    """
+    Headless game rules: paddles, ball, scoring.
+    Has no dependency on the pygame display, fonts or mixer, so it can be
+    stepped on machines without a screen or audio device.
+    All randomness comes from `self.rng`, seeded with `seed`; None picks a
+    fresh seed, kept in `self.seed` so the run can be reproduced. Seeds must
+    be in [0, MAX_SEED] and `target_score` at most MAX_SCORE, so that the
+    state fits snapshot()'s fixed layout.
+    """
+    # No per-instance dict: servers keep thousands of these. Subclasses
+    # must declare __slots__ for their own attributes too (see GameEngine).
+    __slots__ = ("seed", "rng", "width", "height", "paddle_width", "paddle_height",
+                 "player", "ai", "ball", "player_score", "ai_score", "target_score",
+                 "collision", "_rng_blob", "_rng_blob_version", "ai_controller", "player_controller", "profiler")
+
+    def __init__(self, width, height, collision=COLLISION_DISCRETE, seed=None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        check_seed(seed)
+        self.seed = seed
+        self.rng = TrackedRandom(seed)
+        self.width = width
+        self.height = height
+        self.paddle_width = 10
+        self.paddle_height = 100
+
+        self.player = Paddle(10, height // 2 - 50, self.paddle_width, self.paddle_height)
+        self.ai = Paddle(width - 20, height // 2 - 50, self.paddle_width, self.paddle_height)
+        self.ball = Ball(width // 2, height // 2, 7, 7, width, height, self.rng)
+
+        self.player_score = 0
+        self.ai_score = 0
+        self.target_score = 5  # default winning score
+        self.collision = collision
+        self._rng_blob = None  # packed RNG state, valid while rng.version is unchanged
+        self._rng_blob_version = None
+        # Optional callable(sim, paddle, scale) that moves the AI paddle instead
+        # of Paddle.auto_track(); see game/ai.py
+        self.ai_controller = None
+        # Same, for the left paddle: moves it every tick on top of `inputs`,
+        # e.g. to let two controllers play each other
+        self.player_controller = None
+        self.profiler = None  # optional profiling.Profiler
+
+    def step(self, inputs=0, dt=None, ai_inputs=None):
+        """
+        Advances the game by one frame.
+        `inputs` is a bitmask of INPUT_UP / INPUT_DOWN for the player paddle.
+        `dt` is the tick length in seconds; None means one 60 Hz frame.
+        `ai_inputs`, if given, drives the right paddle like a second player
+        instead of the built-in AI.
+        Returns a bitmask of the EVENT_* flags that happened this frame.
+        """
+        ball = self.ball
+        events = 0
+        scale = 1.0 if dt is None else dt * BASE_TICK_RATE
+
+        if inputs & INPUT_UP:
+            self.player.move(-PLAYER_SPEED * scale, self.height)
+        if inputs & INPUT_DOWN:
+            self.player.move(PLAYER_SPEED * scale, self.height)
+        if ai_inputs is not None:
+            if ai_inputs & INPUT_UP:
+                self.ai.move(-PLAYER_SPEED * scale, self.height)
+            if ai_inputs & INPUT_DOWN:
+                self.ai.move(PLAYER_SPEED * scale, self.height)
+
+        prof = self.profiler
+        if prof is not None:
+            start = prof.clock()
+
+        if self.collision == COLLISION_SWEPT:
+            events |= self._move_ball_swept(scale)
+        else:
+            events |= self._move_ball_discrete(scale)
+        if prof is not None:
+            start = prof.record(SPAN_COLLISION, start)
+
+        # Scoring
+        if ball.x <= 0:
+            self.ai_score += 1
+            ball.reset()
+            events |= EVENT_SCORE
+        elif ball.x >= self.width:
+            self.player_score += 1
+            ball.reset()
+            events |= EVENT_SCORE
+        if prof is not None:
+            start = prof.record(SPAN_SCORING, start)
+
+        # Finally, move AI
+        if self.player_controller is not None:
+            self.player_controller(self, self.player, scale)
+        if ai_inputs is None:
+            if self.ai_controller is None:
+                self.ai.auto_track(ball, self.height, scale)
+            else:
+                self.ai_controller(self, self.ai, scale)
+        if prof is not None:
+            prof.record(SPAN_AI, start)
+        return events
+
+    def _move_ball_discrete(self, scale):
+        ball = self.ball
+        events = 0
+
+        # Move the ball first
+        ball.move(scale)
+
+        # Immediately check for paddle collisions
+        if _overlaps(ball, self.player):
+            ball.x = self.player.x + self.player.width  # reposition to avoid overlap
+            ball.velocity_x *= -1
+            events |= EVENT_PADDLE_HIT
+        elif _overlaps(ball, self.ai):
+            ball.x = self.ai.x - ball.width  # reposition to avoid overlap
+            ball.velocity_x *= -1
+            events |= EVENT_PADDLE_HIT
+
+        # Wall bounce
+        if ball.y <= 0 or ball.y + ball.height >= self.height:
+            ball.velocity_y *= -1
+            events |= EVENT_WALL_BOUNCE
+        return events
+
+    def _move_ball_swept(self, scale):
+        """
+        Moves the ball along its path, bouncing at the exact time it reaches
+        a wall or the front face of a paddle, then spends the rest of the
+        frame's movement in the new direction. Fast balls cannot tunnel.
+        """
+        ball = self.ball
+        events = 0
+        remaining = scale
+
+        # A frame can contain at most one paddle bounce and a few wall bounces
+        for _ in range(4):
+            dx = ball.velocity_x * remaining
+            dy = ball.velocity_y * remaining
+            t_hit = None
+            hit = 0
+
+            # Front face of the paddle the ball is heading towards
+            if dx < 0:
+                paddle = self.player
+                face = paddle.x + paddle.width
+                if ball.x >= face > ball.x + dx:
+                    t_hit, hit = (face - ball.x) / dx, EVENT_PADDLE_HIT
+            elif dx > 0:
+                paddle = self.ai
+                face = paddle.x
+                if ball.x + ball.width <= face < ball.x + ball.width + dx:
+                    t_hit, hit = (face - ball.x - ball.width) / dx, EVENT_PADDLE_HIT
+            if hit:
+                y_at = ball.y + dy * t_hit
+                if not (y_at < paddle.y + paddle.height and paddle.y < y_at + ball.height):
+                    t_hit, hit = None, 0
+
+            # Top / bottom wall
+            if dy < 0 and ball.y + dy < 0:
+                t = max(0.0, -ball.y / dy)
+                if t_hit is None or t < t_hit:
+                    t_hit, hit = t, EVENT_WALL_BOUNCE
+            elif dy > 0 and ball.y + ball.height + dy > self.height:
+                t = max(0.0, (self.height - ball.height - ball.y) / dy)
+                if t_hit is None or t < t_hit:
+                    t_hit, hit = t, EVENT_WALL_BOUNCE
+
+            if hit == 0:
+                ball.x += dx
+                ball.y += dy
+                break
+
+            # Advance to the contact point and reflect
+            ball.x += dx * t_hit
+            ball.y += dy * t_hit
+            if hit == EVENT_PADDLE_HIT:
+                ball.velocity_x *= -1
+            else:
+                ball.velocity_y *= -1
+            events |= hit
+            remaining *= 1.0 - t_hit
+        return events
+
+    def snapshot(self, buffer=None, offset=0):
+        """
+        Packs the full game state (including the RNG) into `buffer` at `offset`,
+        using the fixed STATE layout. A new buffer is allocated when None.
+        Returns a memoryview of the packed bytes.
+        """
+        if not 0 <= self.target_score <= MAX_SCORE:
+            raise ValueError(f"target_score must be in [0, {MAX_SCORE}] to be snapshotted")
+        if buffer is None:
+            buffer = bytearray(STATE.size)
+        ball = self.ball
+        ENTITY_STATE.pack_into(buffer, offset, self.seed,
+                               ball.x, ball.y, ball.velocity_x, ball.velocity_y,
+                               self.player.y, self.ai.y,
+                               self.player_score, self.ai_score, self.target_score)
+
+        # The RNG rarely advances (serves), so its packed state is reused
+        # between snapshots instead of calling getstate() every time
+        rng = self.rng
+        if self._rng_blob_version != rng.version:
+            _, words, gauss = rng.getstate()
+            self._rng_blob = RNG_STATE.pack(*words, gauss is not None, gauss or 0.0)
+            self._rng_blob_version = rng.version
+        start = offset + ENTITY_STATE.size
+        view = memoryview(buffer)
+        view[start:start + RNG_STATE.size] = self._rng_blob
+        return view[offset:offset + STATE.size]
+
+    def restore(self, buffer, offset=0):
+        """Loads a state written by snapshot() from `buffer` at `offset`."""
+        ball = self.ball
+        (self.seed, ball.x, ball.y, ball.velocity_x, ball.velocity_y, self.player.y, self.ai.y,
+         self.player_score, self.ai_score, self.target_score) = ENTITY_STATE.unpack_from(buffer, offset)
+
+        start = offset + ENTITY_STATE.size
+        rng_blob = bytes(memoryview(buffer)[start:start + RNG_STATE.size])
+        rng = self.rng
+        if rng_blob != self._rng_blob or self._rng_blob_version != rng.version:
+            values = RNG_STATE.unpack(rng_blob)
+            has_gauss, gauss = values[-2:]
+            rng.setstate((3, values[:-2], gauss if has_gauss else None))
+            self._rng_blob = rng_blob
+            self._rng_blob_version = rng.version
+
+    def winner(self):
+        """Returns "player" or "ai" once the target score is reached, else None."""
+        if self.player_score >= self.target_score:
+            return "player"
+        if self.ai_score >= self.target_score:
+            return "ai"
+        return None
+
+    def reset_match(self, seed=None):
+        """
+        Resets scores, ball and paddles for a new match.
+        The RNG is reseeded (from `seed`, or a value drawn from the current
+        stream), so every match can be replayed from its own `self.seed`.
+        """
+        if seed is None:
+            seed = self.rng.getrandbits(64)
+        check_seed(seed)
+        self.seed = seed
+        self.rng.seed(seed)
+        self.player_score = 0
+        self.ai_score = 0
+        self.ball.serve()
+        self.player.y = self.height // 2 - self.paddle_height // 2
+        self.ai.y = self.height // 2 - self.paddle_height // 2
+
+
+def _overlaps(ball, paddle):
+    # Same test as pygame.Rect.colliderect, without allocating Rects
+    return (ball.x < paddle.x + paddle.width and paddle.x < ball.x + ball.width
+            and ball.y < paddle.y + paddle.height and paddle.y < ball.y + ball.height)
+
+
+def check_seed(seed):
+    """Raises ValueError unless `seed` fits the unsigned 64-bit seed field."""
+    if not isinstance(seed, int) or not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"seed must be an integer in [0, {MAX_SEED}], got {seed!r}")
+
+
+def spawn_seeds(seed, n):
+    """Derives `n` independent child seeds from `seed`, e.g. one per worker process."""
+    parent = random.Random(seed)
+    return [parent.getrandbits(64) for _ in range(n)]
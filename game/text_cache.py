@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """
+    LRU cache of rendered text surfaces keyed by (text, color, antialias).
+    Static labels are rasterized once instead of every frame.
+    """
+
+    def __init__(self, font, max_size=64):
+        self.font = font
+        self.max_size = max_size
+        self._surfaces = OrderedDict()
+
+    def render(self, text, color, antialias=True):
+        key = (text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = self.font.render(text, antialias, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.max_size:
+                self._surfaces.popitem(last=False)  # evict least recently used
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+class DigitAtlas:
+    """Pre-rendered glyphs 0-9, so numbers can be drawn by blitting only."""
+
+    def __init__(self, font, color, antialias=True):
+        self.glyphs = [font.render(str(digit), antialias, color) for digit in range(10)]
+
+    def blit(self, screen, number, pos):
+        """
+        Draws a non-negative integer with its top-left corner at `pos`.
+        Returns the rect that was drawn over.
+        """
+        x, y = pos
+        drawn = None
+        for char in str(number):
+            glyph = self.glyphs[ord(char) - 48]
+            area = screen.blit(glyph, (x, y))
+            drawn = area if drawn is None else drawn.union(area)
+            x += glyph.get_width()
+        return drawn
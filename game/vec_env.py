@@ -0,0 +1,139 @@
+"""
+Vectorized reinforcement learning environment on top of BatchSimulation.
+
+The agent plays the left paddle against the tracking AI in `num_envs`
+matches at once. The API follows gymnasium's VectorEnv:
+
+    env = PongVectorEnv(1024)
+    obs, infos = env.reset(seed=0)
+    obs, rewards, terminated, truncated, infos = env.step(actions)
+
+Actions are 0 (stay), 1 (up) or 2 (down), which are also the INPUT_*
+bitmasks the simulation takes. Observations are float32 rows of ball x, y,
+vx, vy, player y and AI y, positions divided by the court size and
+velocities by the serve speed. The reward is +1 when the agent scores and
+-1 when the AI does. An episode terminates when a match is won and is
+truncated after `max_episode_steps`.
+
+With `autoreset` (the default) finished matches restart within the same
+step; the observation they ended on is in infos["final_obs"], selected by
+the boolean infos["_final_obs"].
+
+gymnasium is optional: when it is installed the usual `*_space`
+attributes are set, otherwise they are None.
+"""
+import numpy as np
+
+from .batch import BatchSimulation
+
+try:
+    import gymnasium
+except ImportError:
+    gymnasium = None
+
+OBSERVATION_SIZE = 6
+ACTIONS = 3
+
+WHITE = 255
+
+
+class PongVectorEnv:
+    metadata = {"render_modes": ["rgb_array"], "autoreset_mode": "same-step"}
+
+    def __init__(self, num_envs, width=800, height=600, max_episode_steps=18000,
+                 autoreset=True, render_mode=None, render_size=None):
+        if render_mode not in (None, "rgb_array"):
+            raise ValueError(f"unsupported render mode {render_mode!r}")
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.max_episode_steps = max_episode_steps
+        self.autoreset = autoreset
+        self.render_mode = render_mode
+        self.render_size = render_size or (height, width)  # rows, columns of rendered frames
+
+        self.sim = BatchSimulation(num_envs, width, height)
+        self.episode_steps = np.zeros(num_envs, dtype=np.int64)
+        self._obs_scale = np.array([1 / width, 1 / height, 1 / 5, 1 / 3, 1 / height, 1 / height],
+                                   dtype=np.float32)
+
+        if gymnasium is not None:
+            spaces = gymnasium.spaces
+            self.single_observation_space = spaces.Box(-np.inf, np.inf, (OBSERVATION_SIZE,), np.float32)
+            self.single_action_space = spaces.Discrete(ACTIONS)
+            self.observation_space = spaces.Box(-np.inf, np.inf, (num_envs, OBSERVATION_SIZE), np.float32)
+            self.action_space = spaces.MultiDiscrete(np.full(num_envs, ACTIONS))
+        else:
+            self.single_observation_space = self.single_action_space = None
+            self.observation_space = self.action_space = None
+
+    def reset(self, seed=None, options=None):
+        """Starts new matches everywhere. Returns (observations, infos)."""
+        self.sim = BatchSimulation(self.num_envs, self.width, self.height, seed=seed)
+        self.episode_steps[:] = 0
+        return self._observe(), {}
+
+    def step(self, actions):
+        """
+        Advances every match by one frame with one action per match.
+        Returns (observations, rewards, terminated, truncated, infos).
+        """
+        sim = self.sim
+        player_score = sim.player_score.copy()
+        ai_score = sim.ai_score.copy()
+        sim.step(np.asarray(actions, dtype=np.uint8))
+        self.episode_steps += 1
+
+        rewards = ((sim.player_score - player_score) - (sim.ai_score - ai_score)).astype(np.float32)
+        terminated = sim.winners() != 0
+        truncated = ~terminated & (self.episode_steps >= self.max_episode_steps)
+        obs = self._observe()
+        infos = {}
+
+        done = terminated | truncated
+        if self.autoreset and done.any():
+            infos["final_obs"] = obs.copy()
+            infos["_final_obs"] = done
+            sim.reset_matches(done)
+            self.episode_steps[done] = 0
+            obs = self._observe()
+        return obs, rewards, terminated, truncated, infos
+
+    def _observe(self):
+        sim = self.sim
+        obs = np.stack((sim.ball_x, sim.ball_y, sim.ball_vx, sim.ball_vy, sim.player_y, sim.ai_y),
+                       axis=1).astype(np.float32)
+        obs *= self._obs_scale
+        return obs
+
+    def render(self):
+        """
+        Rasterizes every match into a uint8 array of shape
+        (num_envs, rows, columns, 3), without pygame or a display.
+        Returns None unless render_mode is "rgb_array".
+        """
+        if self.render_mode != "rgb_array":
+            return None
+        sim = self.sim
+        rows, columns = self.render_size
+        sy, sx = rows / self.height, columns / self.width
+        frames = np.zeros((self.num_envs, rows, columns, 3), dtype=np.uint8)
+        row_index = np.arange(rows)
+        column_index = np.arange(columns)
+
+        boxes = ((sim.player_x, sim.player_y, sim.paddle_width, sim.paddle_height),
+                 (sim.ai_x, sim.ai_y, sim.paddle_width, sim.paddle_height),
+                 (sim.ball_x, sim.ball_y, sim.ball_size, sim.ball_size))
+        for x, y, w, h in boxes:
+            # Every object covers at least one pixel, however small the frame
+            x0 = np.floor(np.broadcast_to(x, (self.num_envs,)) * sx).astype(np.int64)
+            y0 = np.floor(y * sy).astype(np.int64)
+            x1 = np.maximum(np.ceil((x + w) * sx).astype(np.int64), x0 + 1)
+            y1 = np.maximum(np.ceil((y + h) * sy).astype(np.int64), y0 + 1)
+            in_rows = (row_index >= y0[:, None]) & (row_index < y1[:, None])
+            in_columns = (column_index >= x0[:, None]) & (column_index < x1[:, None])
+            frames[in_rows[:, :, None] & in_columns[:, None, :]] = WHITE
+        return frames
+
+    def close(self):
+        pass
@@ -1,5 +1,15 @@
+import argparse
+import os
+import time
+
 import pygame
-from game.game_engine import GameEngine
+from game.game_engine import GameEngine, STATE_PLAYING, STATE_MENU
+from game.simulation import COLLISION_DISCRETE, COLLISION_SWEPT, check_seed
+from game.replay import ReplayRecorder
+from game.netcode import Channel, RollbackSession, SessionMismatch
+from game.ai import PredictiveAI, LookaheadAI
+from game.perf import FrameStats
+from game.profiling import Profiler, SPAN_INPUT, SPAN_UPDATE, SPAN_RENDER, SPAN_FLIP
 
 # Initialize pygame/Start application
 pygame.init()
@@ -15,28 +25,183 @@ BLACK = (0, 0, 0)
 
 # Clock
 clock = pygame.time.Clock()
-FPS = 60
+FPS = 60          # render frame cap (0 = uncapped)
+TICK_RATE = 60    # physics ticks per second
+MAX_FRAME_TIME = 0.25  # don't try to catch up more than this after a stall
+
+
+def seed_arg(text):
+    try:
+        seed = int(text)
+        check_seed(seed)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return seed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ping Pong - Pygame Version")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help="render frame cap, 0 for uncapped (default: %(default)s)")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE,
+                        help="physics ticks per second (default: %(default)s)")
+    parser.add_argument("--collision", choices=[COLLISION_DISCRETE, COLLISION_SWEPT],
+                        default=COLLISION_DISCRETE, help="ball collision mode (default: %(default)s)")
+    parser.add_argument("--seed", type=seed_arg, default=None,
+                        help="random seed for a reproducible game")
+    parser.add_argument("--ai", choices=["track", "predict", "lookahead"], default="track",
+                        help="opponent: chase the ball, predict its path or search ahead "
+                             "(default: %(default)s)")
+    parser.add_argument("--ai-reaction", type=int, default=6,
+                        help="predict AI: ticks to wait after each bounce (default: %(default)s)")
+    parser.add_argument("--ai-error", type=float, default=15.0,
+                        help="predict AI: aiming error std-dev in px (default: %(default)s)")
+    parser.add_argument("--ai-budget", type=float, default=4.0,
+                        help="lookahead AI: milliseconds of search per decision (default: %(default)s)")
+    parser.add_argument("--record", metavar="DIR",
+                        help="save a replay of every match into DIR")
+    parser.add_argument("--net-port", type=int,
+                        help="play online: local UDP port (needs --net-peer and --seed)")
+    parser.add_argument("--net-peer", metavar="HOST:PORT",
+                        help="play online: the other player's address")
+    parser.add_argument("--net-side", type=int, choices=(0, 1), default=0,
+                        help="play online: 0 = left paddle, 1 = right paddle")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="record timing spans and write them as a Chrome trace on exit")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only redraw and update the regions that changed")
+    args = parser.parse_args()
+    if args.record and args.ai != "track":
+        parser.error("--record only supports --ai track")
+    if (args.net_port is None) != (args.net_peer is None):
+        parser.error("--net-port and --net-peer must be given together")
+    if args.net_port is not None:
+        # Both peers simulate the same match, so they must start from the same seed
+        if args.seed is None:
+            parser.error("online play needs the same --seed on both peers")
+        # Online frames go through RollbackSession, not GameEngine.update(), so
+        # neither the recorder nor the AI opponent would see them
+        if args.record:
+            parser.error("--record is not supported in online play")
+        if args.ai != "track":
+            parser.error("--ai is not used in online play; the other player controls that paddle")
+        host, _, port = args.net_peer.rpartition(":")
+        if not host or not port.isdigit():
+            parser.error("--net-peer must be HOST:PORT")
+    return args
+
+
+def save_replay(recorder, directory):
+    os.makedirs(directory, exist_ok=True)
+    recorder.save(os.path.join(directory, f"match-{recorder.seed}.pongreplay"))
 
-# Game loop
-engine = GameEngine(WIDTH, HEIGHT)
 
 def main():
+    args = parse_args()
+    engine = GameEngine(WIDTH, HEIGHT, args.collision, seed=args.seed)
+    if args.ai == "predict":
+        engine.ai_controller = PredictiveAI(args.ai_reaction, args.ai_error, seed=engine.seed)
+    elif args.ai == "lookahead":
+        engine.ai_controller = LookaheadAI(budget_ms=args.ai_budget)
+    dt = 1.0 / args.tick_rate
+
+    # Online play: both peers must use the same --seed and --tick-rate (checked per packet)
+    session = None
+    if args.net_port is not None:
+        host, port = args.net_peer.rsplit(":", 1)
+        channel = Channel(args.net_port, (host, int(port)), host="")
+        session = RollbackSession(engine, args.net_side, channel, dt)
+
+    # Frame timings for the F3 overlay
+    engine.perf = FrameStats()
+    clock_ns = time.perf_counter_ns
+    profiler = engine.profiler = Profiler() if args.profile else None
+
     running = True
+    accumulator = 0.0
+    previous = clock_ns()
     while running:
-        SCREEN.fill(BLACK)
+        now = clock_ns()
+        frame_ns = now - previous
+        frame_time = min(frame_ns / 1e9, MAX_FRAME_TIME)
+        accumulator += frame_time
+        previous = now
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.VIDEORESIZE:
+                engine.invalidate_background()
+            engine.handle_event(event)
+        if engine.quit_requested:
+            running = False
 
+        # One replay per match: start with the match, save when it ends
+        if args.record:
+            if engine.state == STATE_PLAYING and engine.recorder is None:
+                engine.recorder = ReplayRecorder(engine, args.tick_rate)
+            elif engine.state != STATE_PLAYING and engine.recorder is not None:
+                save_replay(engine.recorder, args.record)
+                engine.recorder = None
+
+        input_start = clock_ns()
         engine.handle_input()
-        engine.update()
-        engine.render(SCREEN)
-        engine.check_game_over(SCREEN)
+        update_start = clock_ns()
+
+        # Run as many fixed physics ticks as real time has accumulated
+        while accumulator >= dt and engine.state == STATE_PLAYING and not engine.winner():
+            if session is None:
+                engine.update(dt)
+            else:
+                try:
+                    events = session.advance(engine.inputs)
+                except SessionMismatch as e:
+                    print(f"online play stopped: {e}")
+                    running = False
+                    break
+                if events is None:
+                    accumulator = min(accumulator, dt)  # waiting for the peer
+                    break
+                engine.play_sounds(events)
+            accumulator -= dt
+        if engine.state != STATE_PLAYING:
+            accumulator = 0.0
+        if session is not None and running and engine.winner():
+            session.settle()  # a late remote input may still change the result
+
+        update_end = clock_ns()
 
+        engine.check_game_over(frame_time)
+        if session is not None and engine.state == STATE_MENU:
+            running = False  # replay choices are not synchronised between peers
 
-        pygame.display.flip()
-        clock.tick(FPS)
+        # Interpolation needs GameEngine.update(); rollback steps the simulation directly
+        alpha = min(accumulator / dt, 1.0) if session is None else 1.0
+        render_start = clock_ns()
+        if args.dirty_rects:
+            rects = engine.render_dirty(SCREEN, alpha)
+            flip_start = clock_ns()
+            pygame.display.update(rects)
+        else:
+            engine.render(SCREEN, alpha)
+            flip_start = clock_ns()
+            pygame.display.flip()
+        flip_end = clock_ns()
+        engine.perf.add(frame_ns, (update_start - input_start, update_end - update_start,
+                                   flip_start - render_start, flip_end - flip_start))
+        if profiler is not None:
+            profiler.add(SPAN_INPUT, input_start, update_start - input_start)
+            profiler.add(SPAN_UPDATE, update_start, update_end - update_start)
+            profiler.add(SPAN_RENDER, render_start, flip_start - render_start)
+            profiler.add(SPAN_FLIP, flip_start, flip_end - flip_start)
+        clock.tick(args.fps)
 
+    if engine.recorder is not None and engine.recorder.inputs:
+        save_replay(engine.recorder, args.record)
+    if session is not None:
+        session.channel.close()
+    if profiler is not None:
+        profiler.export_chrome_trace(args.profile)
     pygame.quit()
 
 if __name__ == "__main__":
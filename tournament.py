@@ -0,0 +1,234 @@
+"""
+Round-robin tournaments between AI controllers, on a process pool.
+
+Every pair of controllers plays `--games` headless matches, swapping sides
+each game. Each match gets its own seed derived from `--seed`, and the
+built-in controllers are deterministic, so results do not depend on the
+number of workers or on machine load. Matches are sent to the workers in
+chunks. Workers write each match's scores and rally statistics into a
+shared-memory array (game/results.py); a completed chunk only reports its
+match indices, and Elo ratings are updated from the shared rows.
+
+    python tournament.py --controllers track predict lookahead --games 200
+
+Besides the built-in names, a controller can be given as
+`name=package.module:factory`, where `factory(seed)` returns a new
+controller (see game/ai.py) for one match.
+"""
+import argparse
+import importlib
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from game.simulation import (Simulation, COLLISION_DISCRETE, COLLISION_SWEPT, spawn_seeds,
+                             EVENT_PADDLE_HIT, EVENT_WALL_BOUNCE, EVENT_SCORE)
+from game.ai import track, PredictiveAI, LookaheadAI
+from game.results import SharedResults
+
+# name -> factory(seed) returning a fresh controller for one match
+CONTROLLERS = {
+    "track": lambda seed: track,
+    "predict": lambda seed: PredictiveAI(reaction_delay=6, error=15.0, seed=seed),
+    # No time budget: a wall-clock limit would make results depend on machine load
+    "lookahead": lambda seed: LookaheadAI(budget_ms=None),
+}
+
+WIDTH, HEIGHT = 800, 600
+MAX_FRAMES = 60 * 60 * 10  # a match still running after 10 minutes is a draw
+# The built-in AIs return almost every ball at serve speed, so by default
+# each paddle hit speeds the ball up (both axes) until someone misses;
+# the serve after a point is back at normal speed
+SPEEDUP = 1.05
+MAX_BALL_SPEED = 15.0  # px per frame along x; stays below the discrete collision's tunneling speed
+INITIAL_RATING = 1500
+K_FACTOR = 16
+
+_results = None  # this worker's view of the shared results
+
+
+def parse_controller(spec):
+    """Returns (name, spec) for "name" or "name=module:factory"."""
+    name, _, target = spec.partition("=")
+    if not target and name not in CONTROLLERS:
+        raise argparse.ArgumentTypeError(f"unknown controller {name!r}")
+    return name, spec
+
+
+def load_factory(spec):
+    name, _, target = spec.partition("=")
+    if not target:
+        return CONTROLLERS[name]
+    module, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def play_match(left, right, seed, collision=COLLISION_DISCRETE, max_frames=MAX_FRAMES,
+               speedup=SPEEDUP):
+    """
+    Plays one match between two controller factories, multiplying the
+    ball's velocity by `speedup` on every paddle hit (1 = normal rules). Returns
+    (left score, right score, frames, points, rallies, longest rally,
+    left hits, right hits, wall bounces), i.e. a results row without the
+    done flag. Rallies include one still in progress at `max_frames`.
+    """
+    sim = Simulation(WIDTH, HEIGHT, collision, seed=seed)
+    controller_seeds = spawn_seeds(seed, 2)
+    sim.player_controller = left(controller_seeds[0])
+    sim.ai_controller = right(controller_seeds[1])
+    step, winner, ball = sim.step, sim.winner, sim.ball
+    serve_speed = abs(ball.velocity_x)
+    frames = points = rally = longest_rally = left_hits = right_hits = wall_bounces = events = 0
+    while frames < max_frames:
+        events = step()
+        frames += 1
+        if events:
+            if events & EVENT_PADDLE_HIT:
+                rally += 1
+                if ball.velocity_x > 0:
+                    left_hits += 1
+                else:
+                    right_hits += 1
+                factor = min(speedup, MAX_BALL_SPEED / abs(ball.velocity_x))
+                if factor > 1.0:
+                    ball.velocity_x *= factor
+                    ball.velocity_y *= factor
+            if events & EVENT_WALL_BOUNCE:
+                wall_bounces += 1
+            if events & EVENT_SCORE:
+                # Ball.reset() keeps the speed along x; serve at the normal speed
+                ball.velocity_x = math.copysign(serve_speed, ball.velocity_x)
+                points += 1
+                longest_rally = max(longest_rally, rally)
+                rally = 0
+                if winner():
+                    break
+    longest_rally = max(longest_rally, rally)
+    rallies = points + (frames > 0 and not events & EVENT_SCORE)  # cut off mid-rally by max_frames
+    return (sim.player_score, sim.ai_score, frames, points, rallies, longest_rally,
+            left_hits, right_hits, wall_bounces)
+
+
+def attach_results(name, count):
+    """Worker initializer: maps the parent's shared results array."""
+    global _results
+    _results = SharedResults(count, name)
+
+
+def run_chunk(jobs, collision, max_frames, speedup):
+    """
+    Worker entry point: plays (index, left spec, right spec, seed) jobs,
+    writing each result into its row. Returns the indices played.
+    """
+    factories = {}
+    rows = _results.rows
+    for index, left, right, seed in jobs:
+        for spec in (left, right):
+            if spec not in factories:
+                factories[spec] = load_factory(spec)
+        rows[index] = play_match(factories[left], factories[right], seed, collision, max_frames,
+                                 speedup) + (1,)
+    return [index for index, _, _, _ in jobs]
+
+
+class EloTable:
+    def __init__(self, names, k=K_FACTOR):
+        self.k = k
+        self.ratings = {name: float(INITIAL_RATING) for name in names}
+        self.records = {name: [0, 0, 0] for name in names}  # wins, draws, losses
+
+    def update(self, a, b, score):
+        """Records a game between `a` and `b`; `score` is 1 if `a` won, 0.5 for a draw, else 0."""
+        expected = 1 / (1 + 10 ** ((self.ratings[b] - self.ratings[a]) / 400))
+        change = self.k * (score - expected)
+        self.ratings[a] += change
+        self.ratings[b] -= change
+        outcome = {1: 0, 0.5: 1, 0: 2}[score]
+        self.records[a][outcome] += 1
+        self.records[b][2 - outcome] += 1
+
+    def standings(self):
+        lines = [f"{'controller':<16}{'elo':>8}{'won':>8}{'drawn':>8}{'lost':>8}"]
+        for name in sorted(self.ratings, key=self.ratings.get, reverse=True):
+            wins, draws, losses = self.records[name]
+            lines.append(f"{name:<16}{self.ratings[name]:>8.0f}{wins:>8}{draws:>8}{losses:>8}")
+        return "\n".join(lines)
+
+
+def schedule(specs, games, seed):
+    """Yields (index, left spec, right spec, seed) for every match of the round robin."""
+    pairs = list(itertools.combinations(specs, 2))
+    seeds = spawn_seeds(seed, len(pairs) * games)
+    index = 0
+    for a, b in pairs:
+        for game in range(games):
+            left, right = (a, b) if game % 2 == 0 else (b, a)
+            yield index, left, right, seeds[index]
+            index += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin tournament between AI controllers")
+    parser.add_argument("--controllers", nargs="+", type=parse_controller,
+                        default=[("track", "track"), ("predict", "predict")],
+                        help=f"built-in ({', '.join(CONTROLLERS)}) or name=module:factory")
+    parser.add_argument("--games", type=int, default=100, help="matches per pair (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=20, help="matches per worker task (default: %(default)s)")
+    parser.add_argument("--collision", choices=[COLLISION_DISCRETE, COLLISION_SWEPT],
+                        default=COLLISION_DISCRETE)
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES,
+                        help="frames before a match counts as a draw (default: %(default)s)")
+    parser.add_argument("--speedup", type=float, default=SPEEDUP,
+                        help="ball speed factor per paddle hit, 1 for the normal game "
+                             "(default: %(default)s)")
+    parser.add_argument("--save-results", metavar="FILE",
+                        help="also save the per-match rows (game/results.py) as a .npy file")
+    args = parser.parse_args()
+
+    names = {spec: name for name, spec in args.controllers}
+    if len(names) < 2:
+        parser.error("need at least two different controllers")
+    jobs = list(schedule(list(names), args.games, args.seed))
+    elo = EloTable(names.values())
+
+    started = time.perf_counter()
+    done = frames = draws = 0
+    with SharedResults(len(jobs)) as results, \
+            ProcessPoolExecutor(args.workers, initializer=attach_results,
+                                initargs=(results.name, len(jobs))) as pool:
+        rows = results.rows
+        futures = [pool.submit(run_chunk, jobs[i:i + args.chunk], args.collision, args.max_frames,
+                               args.speedup)
+                   for i in range(0, len(jobs), args.chunk)]
+        for future in as_completed(futures):
+            for index in future.result():
+                _, left, right, _ = jobs[index]
+                left_score, right_score = int(rows[index]["left_score"]), int(rows[index]["right_score"])
+                score = 1 if left_score > right_score else 0 if left_score < right_score else 0.5
+                elo.update(names[left], names[right], score)
+                draws += score == 0.5
+                frames += int(rows[index]["frames"])
+                done += 1
+            elapsed = time.perf_counter() - started
+            print(f"\r{done}/{len(jobs)} matches, {frames / elapsed:,.0f} frames/s", end="", flush=True)
+        print()
+        summary = results.summary()
+        if args.save_results:
+            np.save(args.save_results, rows)
+    print(elo.standings())
+    print(f"{summary['points']} points in {summary['rallies']} rallies, "
+          f"{summary['hits_per_rally']:.1f} hits per rally, "
+          f"longest rally {summary['longest_rally']} hits")
+    if draws == done:
+        print(f"warning: all {done} matches were draws, so the ratings say nothing; "
+              f"try a higher --speedup or --max-frames")
+
+
+if __name__ == "__main__":
+    main()